@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from stock_information_scraper.csv_generator import CsvGenerator
+from stock_information_scraper.html_fetcher import SourceHtmls
+from stock_information_scraper.parser_backend import AUTO, PARSERS, resolve_parser
+from stock_information_scraper.replay_server import RECORDED_SOURCES, ReplayServer
+from stock_information_scraper.stock_information import StockInformationGenerator, source_htmls_to_source_soups
+
+try:
+    import resource
+except ImportError:
+    # Unix only, there is no peak memory of the child process on Windows
+    resource = None
+
+FIXTURE_DIR = "tests/data"
+FIXTURE_TICKERS = ("lly", "meta")
+
+
+def create_synthetic_tickers(count: int) -> List[str]:
+    # LLY and META take turns, so every synthetic ticker has real pages behind it
+    return [f"{FIXTURE_TICKERS[i % len(FIXTURE_TICKERS)].upper()}{i:04d}" for i in range(count)]
+
+
+def _fixture_ticker(ticker: str) -> str:
+    return ticker.rstrip("0123456789").lower()
+
+
+def _read_fixture(ticker: str, source: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, f"{_fixture_ticker(ticker)}_{source}.html"), "r") as html_file:
+        return html_file.read()
+
+
+def create_source_htmls(tickers: List[str]) -> List[SourceHtmls]:
+    pages = {
+        (fixture_ticker, source): _read_fixture(fixture_ticker, source)
+        for fixture_ticker in FIXTURE_TICKERS
+        for source in RECORDED_SOURCES.values()
+    }
+    return [
+        SourceHtmls(
+            ticker=ticker,
+            **{html_field: pages[(_fixture_ticker(ticker), source)] for html_field, source in RECORDED_SOURCES.items()},
+        )
+        for ticker in tickers
+    ]
+
+
+def write_replay_pages(tickers: List[str], page_dir: str):
+    for ticker in tickers:
+        for source in RECORDED_SOURCES.values():
+            with open(os.path.join(page_dir, f"{ticker.lower()}_{source}.html"), "w") as html_file:
+                html_file.write(_read_fixture(ticker, source))
+
+
+def measure(run: Callable[[], None], setup: Callable[[], None] = lambda: None, repeat: int = 3) -> Dict[str, float]:
+    # The best of `repeat` timed runs, then one more run under tracemalloc (which slows it down) for the peak memory
+    seconds = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+
+    setup()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": min(seconds), "peak_memory_bytes": peak - baseline}
+
+
+def _with_throughput(result: Dict[str, float], tickers: int) -> Dict[str, float]:
+    result["tickers_per_second"] = tickers / result["seconds"] if result["seconds"] else None
+    return result
+
+
+def benchmark_stages(tickers: List[str], parser: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    source_htmls_list = create_source_htmls(tickers)
+    state = {}
+
+    def parse():
+        for source_htmls in source_htmls_list:
+            source_htmls_to_source_soups(source_htmls, parser=parser, targeted=True)
+
+    def create_generators():
+        state["generators"] = [
+            StockInformationGenerator(source_htmls, parser=parser, targeted=True) for source_htmls in source_htmls_list
+        ]
+
+    def extract():
+        state["stock_information"] = [generator.get_stock_information() for generator in state["generators"]]
+
+    def to_dict():
+        for info in state["stock_information"]:
+            info.to_dict()
+
+    def save_csv():
+        # CsvGenerator prints the file name, which would end up in the JSON on stdout
+        with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+            CsvGenerator(state["stock_information"]).save_csv(os.path.join(tmp_dir, "numbers.csv"))
+
+    stages = {
+        "parse": measure(parse, repeat=repeat),
+        "extract": measure(extract, setup=create_generators, repeat=repeat),
+    }
+    state.pop("generators")
+    stages["to_dict"] = measure(to_dict, repeat=repeat)
+    stages["save_csv"] = measure(save_csv, repeat=repeat)
+    return {name: _with_throughput(result, len(tickers)) for name, result in stages.items()}
+
+
+def _get_children_peak_rss() -> Optional[int]:
+    # The largest child process so far
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def benchmark_main(tickers: List[str], parser: str, concurrency: int, processes: int) -> Dict[str, float]:
+    # The whole main.py flow against the replay server, in its own process like a real run
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_replay_pages(tickers, tmp_dir)
+        ticker_file = os.path.join(tmp_dir, "tickers.txt")
+        with open(ticker_file, "w") as tickers_txt:
+            tickers_txt.write("\n".join(tickers))
+
+        with ReplayServer(page_dirs=[tmp_dir]) as replay_server:
+            command = [
+                sys.executable,
+                "-m",
+                "stock_information_scraper.main",
+                "-t",
+                ticker_file,
+                "-o",
+                os.path.join(tmp_dir, "numbers.csv"),
+                "-c",
+                str(concurrency),
+                "-p",
+                str(processes),
+                "--parser",
+                parser,
+                "--base-url",
+                replay_server.root_url,
+            ]
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            seconds = time.perf_counter() - start
+
+    return _with_throughput({"seconds": seconds, "peak_memory_bytes": _get_children_peak_rss()}, len(tickers))
+
+
+def _get_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+def run_benchmarks(
+    ticker_count: int = 20,
+    parser: str = AUTO,
+    repeat: int = 3,
+    end_to_end: bool = True,
+    concurrency: int = 8,
+    processes: int = 0,
+) -> Dict:
+    parser = resolve_parser(parser)
+    tickers = create_synthetic_tickers(ticker_count)
+    stages = benchmark_stages(tickers, parser=parser, repeat=repeat)
+    if end_to_end:
+        stages["main"] = benchmark_main(tickers, parser=parser, concurrency=concurrency, processes=processes)
+    return {
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "tickers": ticker_count,
+        "parser": parser,
+        "stages": stages,
+    }
+
+
+def compare(baseline: Dict, results: Dict) -> List[str]:
+    # Throughput is compared, so runs with different numbers of tickers still give a fair speedup. Peak memory grows
+    # with the number of tickers, so it is only compared between runs of the same size.
+    same_size = baseline.get("tickers") == results.get("tickers")
+    lines = []
+    for name, result in results["stages"].items():
+        before = baseline["stages"].get(name)
+        if before is None:
+            continue
+        if before["tickers_per_second"] and result["tickers_per_second"] is not None:
+            speedup = result["tickers_per_second"] / before["tickers_per_second"]
+        else:
+            speedup = float("inf")
+        memory = None
+        if same_size and result["peak_memory_bytes"] is not None and before["peak_memory_bytes"]:
+            memory = result["peak_memory_bytes"] / before["peak_memory_bytes"]
+        memory_text = f", {memory:.2f}x peak memory" if memory is not None else ""
+        lines.append(f"{name}: {speedup:.2f}x as fast{memory_text}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures throughput and peak memory of every pipeline stage.")
+    parser.add_argument("-n", "--tickers", type=int, default=20, help="Number of synthetic tickers.")
+    parser.add_argument("--parser", type=str, choices=PARSERS, default=AUTO)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage, the fastest one counts.")
+    parser.add_argument("--skip-main", action="store_true", help="Only benchmark the stages in-process.")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-p", "--processes", type=int, default=0)
+    parser.add_argument("-o", "--out_file", type=str, help="JSON file to write the results to.", nargs="?")
+    parser.add_argument("--compare", type=str, help="JSON results of an earlier run to compare with.", nargs="?")
+    args = parser.parse_args()
+
+    benchmark_results = run_benchmarks(
+        ticker_count=args.tickers,
+        parser=args.parser,
+        repeat=args.repeat,
+        end_to_end=not args.skip_main,
+        concurrency=args.concurrency,
+        processes=args.processes,
+    )
+    output = json.dumps(benchmark_results, indent=2)
+    if args.out_file:
+        with open(args.out_file, "w") as results_json:
+            results_json.write(output)
+    print(output)
+    if args.compare:
+        with open(args.compare, "r") as baseline_json:
+            print("\n".join(compare(json.load(baseline_json), benchmark_results)))
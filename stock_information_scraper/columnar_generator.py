@@ -0,0 +1,112 @@
+import ast
+import math
+import sys
+import zipfile
+from array import array
+from typing import Dict, Iterable, List, Union
+
+from stock_information_scraper.stock_information import StockInformation, StockInformationMatrix
+
+# Written as .npz without needing numpy: numpy.load(file_name) returns one array per field, and for every
+# numeric field a boolean "<field>_mask" array that is True where the value is missing.
+TEXT_FIELDS = ("ticker", "company")
+INTEGER_FIELDS = ("max_year",)
+MASK_SUFFIX = "_mask"
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_bytes(descr: str, length: int, data: bytes) -> bytes:
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    # The header is padded with spaces so the data starts at a multiple of 64 bytes
+    padding = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + " " * (padding % 64) + "\n").encode("latin1")
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header + data
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _text_column(values: List[str]) -> bytes:
+    width = max([len(value) for value in values] + [1])
+    data = b"".join(value.ljust(width, "\0").encode("utf-32-le") for value in values)
+    return _npy_bytes(f"<U{width}", len(values), data)
+
+
+class ColumnarGenerator:
+
+    def __init__(self, stock_information_list: Union[StockInformationMatrix, Iterable[StockInformation]]):
+        self.stock_information = stock_information_list
+
+    def _iter_values(self) -> Iterable[tuple]:
+        # The rows of a matrix are read as they are, without a StockInformation per ticker
+        if isinstance(self.stock_information, StockInformationMatrix):
+            return self.stock_information.rows
+        return (info.values for info in self.stock_information)
+
+    def save_npz(self, file_name: str, compress: bool = False) -> int:
+        print(f"Data will be saved to {file_name}")
+        fields = StockInformation.FIELDS
+        text_columns: Dict[str, List[str]] = {field: [] for field in TEXT_FIELDS}
+        numeric_columns: Dict[str, array] = {
+            field: array("q" if field in INTEGER_FIELDS else "d") for field in fields if field not in TEXT_FIELDS
+        }
+        masks: Dict[str, array] = {field: array("B") for field in numeric_columns}
+
+        rows = 0
+        for values in self._iter_values():
+            for field, value in zip(fields, values):
+                if field in text_columns:
+                    text_columns[field].append("" if value is None else str(value))
+                    continue
+                missing = value is None or (isinstance(value, float) and math.isnan(value))
+                if field in INTEGER_FIELDS:
+                    numeric_columns[field].append(0 if missing else int(value))
+                else:
+                    numeric_columns[field].append(math.nan if missing else float(value))
+                masks[field].append(missing)
+            rows += 1
+
+        compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(file_name, "w", compression=compression) as npz:
+            for field in fields:
+                if field in text_columns:
+                    npz.writestr(f"{field}.npy", _text_column(text_columns[field]))
+                    continue
+                column = numeric_columns[field]
+                descr = "<i8" if column.typecode == "q" else "<f8"
+                npz.writestr(f"{field}.npy", _npy_bytes(descr, rows, _little_endian(column)))
+                npz.writestr(f"{field}{MASK_SUFFIX}.npy", _npy_bytes("|b1", rows, masks[field].tobytes()))
+        return rows
+
+
+def load_npz(file_name: str) -> Dict[str, List]:
+    # Reads files written by ColumnarGenerator without numpy, missing values become None
+    typecodes = {"<f8": "d", "<i8": "q", "|b1": "B"}
+    arrays: Dict[str, List] = {}
+    with zipfile.ZipFile(file_name, "r") as npz:
+        for name in npz.namelist():
+            content = npz.read(name)
+            header_length = int.from_bytes(content[8:10], "little")
+            header = ast.literal_eval(content[10 : 10 + header_length].decode("latin1"))
+            data = content[10 + header_length :]
+            descr = header["descr"]
+            if descr.startswith("<U"):
+                width = int(descr[2:]) * 4
+                values = [data[i : i + width].decode("utf-32-le").rstrip("\0") for i in range(0, len(data), width)]
+            else:
+                column = array(typecodes[descr])
+                column.frombytes(data)
+                if sys.byteorder == "big" and descr != "|b1":
+                    column.byteswap()
+                values = [bool(value) for value in column] if descr == "|b1" else column.tolist()
+            arrays[name[: -len(".npy")]] = values
+
+    for field in [name for name in arrays if not name.endswith(MASK_SUFFIX)]:
+        mask = arrays.pop(f"{field}{MASK_SUFFIX}", None)
+        if mask is not None:
+            arrays[field] = [None if missing else value for value, missing in zip(arrays[field], mask)]
+    return arrays
@@ -1,20 +1,136 @@
 import csv
-from typing import List
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union
 
 from stock_information_scraper import CsvHeader
-from stock_information_scraper.stock_information import StockInformation
+from stock_information_scraper.metrics import Metrics, measure_stage
+from stock_information_scraper.stock_information import StockInformation, StockInformationMatrix
+
+
+def read_written_tickers(file_name: str, ticker_header: str = CsvHeader.ticker) -> Set[str]:
+    if not os.path.exists(file_name):
+        return set()
+    with open(file_name, "r") as ticker_numbers_csv:
+        rows = csv.DictReader(_iter_complete_lines(ticker_numbers_csv))
+        return {row[ticker_header] for row in rows if row.get(ticker_header)}
+
+
+def _iter_complete_lines(lines: Iterable[str]) -> Iterator[str]:
+    # A half written last row does not count, append_csv removes it before the ticker is written again
+    for line in lines:
+        if line.endswith("\n"):
+            yield line
+
+
+def read_max_years(
+    file_name: str, ticker_header: str = CsvHeader.ticker, max_year_header: str = CsvHeader.max_year
+) -> Dict[str, int]:
+    # The newest fiscal year per ticker of an earlier run, tickers without one are left out
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name, "r") as ticker_numbers_csv:
+        return {
+            row[ticker_header]: int(row[max_year_header])
+            for row in csv.DictReader(ticker_numbers_csv)
+            if row.get(ticker_header) and row.get(max_year_header)
+        }
+
+
+def _remove_incomplete_row(file_name: str):
+    # A run that was killed while writing can leave half a row at the end of the file
+    with open(file_name, "rb+") as ticker_numbers_csv:
+        end = ticker_numbers_csv.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - 4096)
+            ticker_numbers_csv.seek(chunk_start)
+            chunk = ticker_numbers_csv.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+        if position != end:
+            ticker_numbers_csv.truncate(position)
+
+
+def merge_csv_files(
+    file_names: Iterable[str],
+    output_file: str,
+    ticker_order: Optional[List[str]] = None,
+    csv_headers: List = CsvHeader().to_list(),
+    ticker_header: str = CsvHeader.ticker,
+) -> int:
+    # Combines the files of several workers into one in CsvHeader column order. A ticker that more than one worker
+    # wrote (e.g. after a lease ran out) ends up once, rows follow ticker_order where given.
+    rows: Dict[str, Dict[str, str]] = {}
+    for file_name in file_names:
+        if not os.path.exists(file_name) or os.path.getsize(file_name) == 0:
+            continue
+        _remove_incomplete_row(file_name)
+        with open(file_name, "r") as ticker_numbers_csv:
+            reader = csv.DictReader(ticker_numbers_csv)
+            if set(reader.fieldnames or []) != set(csv_headers):
+                raise ValueError(f"{file_name} has different columns and cannot be merged")
+            for row in reader:
+                rows.setdefault(row[ticker_header], row)
+
+    if ticker_order is not None:
+        positions = {ticker: position for position, ticker in enumerate(ticker_order)}
+        tickers = sorted(rows, key=lambda ticker: positions.get(ticker, len(positions)))
+    else:
+        tickers = list(rows)
+
+    print(f"Data will be saved to {output_file}")
+    with open(output_file, "w") as ticker_numbers_csv:
+        writer = csv.DictWriter(ticker_numbers_csv, fieldnames=csv_headers)
+        writer.writeheader()
+        for ticker in tickers:
+            writer.writerow(rows[ticker])
+    return len(tickers)
 
 
 class CsvGenerator:
 
-    def __init__(self, stock_information_list: List[StockInformation]):
+    def __init__(
+        self,
+        stock_information_list: Union[StockInformationMatrix, Iterable[StockInformation]],
+        metrics: Optional[Metrics] = None,
+    ):
         self.stock_information = stock_information_list
+        self.metrics = metrics
 
-    def save_csv(self, file_name: str, csv_headers: List = CsvHeader().to_list()):
+    def save_csv(self, file_name: str, csv_headers: List = CsvHeader().to_list()) -> int:
         print(f"Data will be saved to {file_name}")
-        data = [info.to_dict() for info in self.stock_information]
         with open(file_name, "w") as ticker_numbers_csv:
-            writer = csv.DictWriter(ticker_numbers_csv, fieldnames=csv_headers)
+            return self._write_rows(ticker_numbers_csv, csv_headers=csv_headers, write_header=True)
+
+    def append_csv(self, file_name: str, csv_headers: List = CsvHeader().to_list()) -> int:
+        # Adds rows to an existing file (or starts a new one), every row is on disk as soon as it is written
+        print(f"Data will be appended to {file_name}")
+        write_header = not os.path.exists(file_name) or os.path.getsize(file_name) == 0
+        if not write_header:
+            _remove_incomplete_row(file_name)
+            with open(file_name, "r") as ticker_numbers_csv:
+                existing_headers = next(csv.reader(ticker_numbers_csv), [])
+            if existing_headers != csv_headers:
+                raise ValueError(f"{file_name} has different columns and cannot be appended to")
+        with open(file_name, "a") as ticker_numbers_csv:
+            return self._write_rows(ticker_numbers_csv, csv_headers=csv_headers, write_header=write_header)
+
+    def _write_rows(self, ticker_numbers_csv, csv_headers: List, write_header: bool) -> int:
+        writer = csv.DictWriter(ticker_numbers_csv, fieldnames=csv_headers)
+        if write_header:
             writer.writeheader()
-            assert csv_headers == list(data[0].keys())
-            writer.writerows(rowdicts=data)
+        rows_written = 0
+        # Rows are written one by one, so the stock information can be produced lazily. The rows of a matrix are
+        # written as they are, without a StockInformation per ticker.
+        is_matrix = isinstance(self.stock_information, StockInformationMatrix)
+        for info in self.stock_information.rows if is_matrix else self.stock_information:
+            with measure_stage(self.metrics, "write"):
+                row = dict(zip(self.stock_information.csv_headers, info)) if is_matrix else info.to_dict()
+                assert csv_headers == list(row.keys())
+                writer.writerow(row)
+                ticker_numbers_csv.flush()
+            rows_written += 1
+        return rows_written
@@ -0,0 +1,179 @@
+import argparse
+import os
+import socket
+from multiprocessing import Process
+from typing import Iterable, Iterator, List, Optional
+
+from stock_information_scraper.csv_generator import CsvGenerator, merge_csv_files
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.html_fetcher import BaseUrls, ConcurrentHtmlFetcher, SourceHtmls
+from stock_information_scraper.http_client import HttpClient, create_session
+from stock_information_scraper.job_queue import DEFAULT_LEASE_SECONDS, Heartbeat, JobQueue
+from stock_information_scraper.main import create_tickers
+from stock_information_scraper.parser_backend import AUTO, PARSERS
+from stock_information_scraper.pipeline import parse_stage
+from stock_information_scraper.rate_limiter import HostRateLimiter
+from stock_information_scraper.retry_policy import RetryPolicy
+from stock_information_scraper.stock_information import StockInformation
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def get_worker_file(output_dir: str, worker: str) -> str:
+    return os.path.join(output_dir, f"numbers_{worker}.csv")
+
+
+def list_worker_files(output_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(output_dir, name)
+        for name in os.listdir(output_dir)
+        if name.startswith("numbers_") and name.endswith(".csv")
+    )
+
+
+def _complete_written(
+    queue: JobQueue, worker: str, stock_information: Iterator[StockInformation]
+) -> Iterator[StockInformation]:
+    # CsvGenerator asks for the next ticker only after the previous row is on disk
+    previous = None
+    for info in stock_information:
+        if previous is not None:
+            queue.complete(worker, previous.ticker.value)
+        yield info
+        previous = info
+    if previous is not None:
+        queue.complete(worker, previous.ticker.value)
+
+
+def _parse_or_fail(
+    queue: JobQueue, worker: str, source_htmls_iterable: Iterable[SourceHtmls], parser: str, max_attempts: int
+) -> Iterator[StockInformation]:
+    # A page that cannot be parsed only fails its own ticker, not the worker and the rest of the batch
+    for source_htmls in source_htmls_iterable:
+        try:
+            stock_information = next(parse_stage([source_htmls], parser=parser))
+        except Exception as error:
+            print(f"Skipping {source_htmls.ticker}: {error!r}")
+            queue.fail(worker, source_htmls.ticker, repr(error), max_attempts=max_attempts)
+            continue
+        yield stock_information
+
+
+def run_worker(
+    queue: JobQueue,
+    output_file: str,
+    client: HttpClient,
+    worker: Optional[str] = None,
+    batch_size: int = 8,
+    max_workers: int = 4,
+    parser: str = AUTO,
+    base_urls: BaseUrls = BaseUrls(),
+    max_attempts: int = 3,
+) -> int:
+    # Leases tickers until the queue is empty and appends their rows to this worker's own file
+    worker = worker if worker is not None else get_worker_id()
+    tickers_done = 0
+    while True:
+        tickers = queue.lease(worker, count=batch_size, max_attempts=max_attempts)
+        if not tickers:
+            return tickers_done
+        print(f"Worker {worker} leased {', '.join(tickers)}")
+        with Heartbeat(queue, worker):
+            fetcher = ConcurrentHtmlFetcher(
+                tickers=tickers, max_workers=max_workers, client=client, base_urls=base_urls
+            )
+            stock_information = _parse_or_fail(
+                queue, worker, fetcher.iter_source_htmls(), parser=parser, max_attempts=max_attempts
+            )
+            csv_generator = CsvGenerator(_complete_written(queue, worker, stock_information))
+            tickers_done += csv_generator.append_csv(file_name=output_file)
+        for ticker, error in fetcher.failures.items():
+            # A status that is not worth retrying (e.g. 404 for a delisted ticker) will not change on the next lease
+            retryable = error.status_code is None or error.status_code in client.retry_policy.retry_status_codes
+            queue.fail(worker, ticker, str(error), max_attempts=max_attempts if retryable else 0)
+
+
+def _run_worker_process(args: argparse.Namespace):
+    cache = HtmlCache(cache_dir=args.cache_dir) if args.cache_dir else None
+    client = HttpClient(
+        session=create_session(pool_maxsize=args.concurrency),
+        cache=cache,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts),
+        rate_limiter=HostRateLimiter(),
+    )
+    worker = get_worker_id()
+    queue = JobQueue(args.queue, lease_seconds=args.lease_seconds)
+    run_worker(
+        queue,
+        output_file=get_worker_file(args.output_dir, worker),
+        client=client,
+        worker=worker,
+        batch_size=args.batch_size,
+        max_workers=args.concurrency,
+        parser=args.parser,
+        base_urls=BaseUrls.local(args.base_url) if args.base_url else BaseUrls(),
+        max_attempts=args.max_ticker_attempts,
+    )
+    queue.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spreads the tickers over several workers through a shared queue.")
+    parser.add_argument(
+        "--queue", type=str, default="queue.db", help="SQLite file of the queue, shared by all workers."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Add the tickers of a ticker file to the queue.")
+    enqueue_parser.add_argument("-t", "--ticker_file", type=str, help="Path to a ticker file.")
+
+    worker_parser = commands.add_parser("worker", help="Work through the queue until it is empty.")
+    worker_parser.add_argument("--output-dir", type=str, default="workers", help="Directory of the worker files.")
+    worker_parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes to start.")
+    worker_parser.add_argument("-b", "--batch-size", type=int, default=8, help="Tickers leased at a time.")
+    worker_parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help="Seconds after which the tickers of a worker that stopped sending heartbeats go to another worker.",
+    )
+    worker_parser.add_argument(
+        "-c", "--concurrency", type=int, default=4, help="Pages fetched at the same time, per worker."
+    )
+    worker_parser.add_argument("--cache-dir", type=str, help="Directory to cache fetched pages in.", nargs="?")
+    worker_parser.add_argument("--max-attempts", type=int, default=5, help="Maximum number of attempts per page.")
+    worker_parser.add_argument(
+        "--max-ticker-attempts",
+        type=int,
+        default=3,
+        help="Maximum number of times a ticker is leased before it counts as failed.",
+    )
+    worker_parser.add_argument("--parser", type=str, choices=PARSERS, default=AUTO)
+    worker_parser.add_argument("--base-url", type=str, help="Fetch all pages from one stand-in.", nargs="?")
+
+    merge_parser = commands.add_parser("merge", help="Combine the worker files into one CSV file.")
+    merge_parser.add_argument("--output-dir", type=str, default="workers", help="Directory of the worker files.")
+    merge_parser.add_argument("-o", "--out_file", type=str, default="numbers.csv", help="Name of CSV output file.")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        added = JobQueue(args.queue).add(create_tickers(ticker_file_path=args.ticker_file))
+        print(f"Added {added} tickers to {args.queue}")
+    elif args.command == "worker":
+        # Every worker process has its own rate limits, so the hosts see up to --workers times as many requests
+        os.makedirs(args.output_dir, exist_ok=True)
+        processes = [Process(target=_run_worker_process, args=(args,)) for _ in range(args.workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        print(f"Queue {args.queue}: {JobQueue(args.queue).get_counts()}")
+    else:
+        queue = JobQueue(args.queue)
+        rows = merge_csv_files(list_worker_files(args.output_dir), args.out_file, ticker_order=queue.get_tickers())
+        counts = queue.get_counts()
+        print(
+            f"Merged {rows} tickers, {counts['failed']} failed and {counts['pending'] + counts['leased']} not done yet"
+        )
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+from typing import Any, Callable, Iterator, Tuple
+
+# Helpers for caches that keep one JSON file per entry. The modification time of a file doubles as its last access
+# time, so the least recently used entries can be found without an index.
+
+
+def write_json_atomically(path: str, data: Any):
+    # Write to a temporary file first, so readers never see a half written entry
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as temp_file:
+        json.dump(data, temp_file)
+    os.replace(temp_path, path)
+
+
+def touch(path: str):
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        # Evicted by another thread after it was read
+        pass
+
+
+def list_json_files(directory: str) -> Iterator[Tuple[os.stat_result, str]]:
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(root, file_name)
+            try:
+                yield os.stat(path), path
+            except FileNotFoundError:
+                continue
+
+
+def evict_least_recently_used(
+    directory: str, total: float, target: float, get_size: Callable[[os.stat_result], float]
+) -> float:
+    # Removes the least recently used files until the total is at most the target and returns the new total, e.g. of
+    # the bytes or the number of entries depending on get_size
+    for stat, path in sorted(list_json_files(directory), key=lambda stat_and_path: stat_and_path[0].st_mtime):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= get_size(stat)
+    return total
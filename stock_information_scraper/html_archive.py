@@ -0,0 +1,194 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from stock_information_scraper.html_fetcher import SourceHtmls
+from stock_information_scraper.replay_server import RECORDED_SOURCES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+DEFAULT_MAX_PACK_SIZE = 1024 * 1024 * 1024
+INDEX_FILE_NAME = "index.jsonl"
+
+
+@dataclass(frozen=True)
+class ArchiveRecord:
+    ticker: str
+    source: str
+    fetched_on: str  # ISO date
+    pack: str
+    offset: int
+    length: int
+    codec: str
+    sha1: str
+
+
+def get_default_codec() -> str:
+    # zstd decompresses several times faster than zlib, zlib is always there
+    return ZSTD if zstandard is not None else ZLIB
+
+
+def _compress(html: bytes, codec: str) -> bytes:
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=9).compress(html)
+    return zlib.compress(html, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The archive has zstd compressed pages, install zstandard to read them")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _get_pack_name(number: int) -> str:
+    return f"pages-{number:05d}.pack"
+
+
+class HtmlArchive:
+    # Pages are appended to pack files and never rewritten. index.jsonl has one line per (ticker, source, date) with
+    # the position of the compressed page; identical pages (e.g. on consecutive days) are stored only once.
+
+    def __init__(self, archive_dir: str, codec: Optional[str] = None, max_pack_size: int = DEFAULT_MAX_PACK_SIZE):
+        self.archive_dir = archive_dir
+        self.codec = codec if codec is not None else get_default_codec()
+        self.max_pack_size = max_pack_size
+        self._records: Dict[Tuple[str, str, str], ArchiveRecord] = {}
+        self._blobs: Dict[str, ArchiveRecord] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+        os.makedirs(archive_dir, exist_ok=True)
+        self._load_index()
+        self._pack = self._get_current_pack()
+
+    def _load_index(self):
+        index_path = os.path.join(self.archive_dir, INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb+") as index_file:
+            end = 0
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    # A run that was killed while writing can leave half a line at the end. It is cut off, otherwise
+                    # the next record would be appended to it and get lost as well.
+                    index_file.truncate(end)
+                    break
+                end += len(line)
+                try:
+                    record = ArchiveRecord(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                self._add_record(record)
+
+    def _add_record(self, record: ArchiveRecord):
+        self._records[(record.ticker, record.source, record.fetched_on)] = record
+        self._blobs.setdefault(record.sha1, record)
+
+    def _get_current_pack(self) -> int:
+        packs = sorted(name for name in os.listdir(self.archive_dir) if name.endswith(".pack"))
+        if packs and os.path.getsize(os.path.join(self.archive_dir, packs[-1])) < self.max_pack_size:
+            return len(packs) - 1
+        return len(packs)
+
+    def put(self, ticker: str, source: str, html: str, fetched_on: date) -> ArchiveRecord:
+        html_bytes = html.encode("utf-8")
+        sha1 = hashlib.sha1(html_bytes).hexdigest()
+        with self._lock:
+            blob = self._blobs.get(sha1)
+            if blob is None or blob.codec != self.codec:
+                pack = _get_pack_name(self._pack)
+                data = _compress(html_bytes, self.codec)
+                with open(os.path.join(self.archive_dir, pack), "ab") as pack_file:
+                    offset = pack_file.tell()
+                    pack_file.write(data)
+                location = (pack, offset, len(data), self.codec)
+                if offset + len(data) >= self.max_pack_size:
+                    self._pack += 1
+            else:
+                location = (blob.pack, blob.offset, blob.length, blob.codec)
+
+            pack, offset, length, codec = location
+            record = ArchiveRecord(ticker, source, fetched_on.isoformat(), pack, offset, length, codec, sha1)
+            # The page is on disk before the index points to it
+            with open(os.path.join(self.archive_dir, INDEX_FILE_NAME), "a") as index_file:
+                index_file.write(json.dumps(asdict(record)) + "\n")
+            self._add_record(record)
+        return record
+
+    def put_source_htmls(self, source_htmls: SourceHtmls, fetched_on: Optional[date] = None):
+        fetched_on = fetched_on if fetched_on is not None else date.today()
+        for html_field, source in RECORDED_SOURCES.items():
+            self.put(source_htmls.ticker, source, getattr(source_htmls, html_field), fetched_on)
+
+    def _get_map(self, pack: str, end: int) -> mmap.mmap:
+        # Maps are shared between reads and only renewed when the pack has grown past the end of the map
+        pack_map = self._maps.get(pack)
+        if pack_map is None or len(pack_map) < end:
+            if pack_map is not None:
+                pack_map.close()
+            with open(os.path.join(self.archive_dir, pack), "rb") as pack_file:
+                pack_map = self._maps[pack] = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return pack_map
+
+    def read(self, record: ArchiveRecord) -> str:
+        with self._lock:
+            pack_map = self._get_map(record.pack, record.offset + record.length)
+            data = pack_map[record.offset : record.offset + record.length]
+        return _decompress(data, record.codec).decode("utf-8")
+
+    def get(self, ticker: str, source: str, fetched_on: date) -> Optional[str]:
+        record = self._records.get((ticker, source, fetched_on.isoformat()))
+        return self.read(record) if record is not None else None
+
+    def get_source_htmls(self, ticker: str, fetched_on: date) -> Optional[SourceHtmls]:
+        htmls = {}
+        for html_field, source in RECORDED_SOURCES.items():
+            html = self.get(ticker, source, fetched_on)
+            if html is None:
+                return None
+            htmls[html_field] = html
+        return SourceHtmls(ticker=ticker, **htmls)
+
+    def get_dates(self, ticker: Optional[str] = None) -> List[date]:
+        return sorted({date.fromisoformat(key[2]) for key in self._records if ticker is None or key[0] == ticker})
+
+    def iter_source_htmls(self, tickers: Iterable[str], fetched_on: date) -> Iterator[SourceHtmls]:
+        for ticker in tickers:
+            source_htmls = self.get_source_htmls(ticker, fetched_on)
+            if source_htmls is None:
+                print(f"Skipping {ticker}: not in the archive for {fetched_on.isoformat()}")
+                continue
+            yield source_htmls
+
+    def close(self):
+        with self._lock:
+            for pack_map in self._maps.values():
+                pack_map.close()
+            self._maps.clear()
+
+    def __enter__(self) -> "HtmlArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def archive_source_htmls(
+    source_htmls_iterable: Iterable[SourceHtmls], archive: HtmlArchive, fetched_on: Optional[date] = None
+) -> Iterator[SourceHtmls]:
+    # Keeps every page on the way through, so the values can be extracted again later without the network
+    for source_htmls in source_htmls_iterable:
+        archive.put_source_htmls(source_htmls, fetched_on=fetched_on)
+        yield source_htmls
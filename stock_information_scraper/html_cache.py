@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from stock_information_scraper.file_store import (
+    evict_least_recently_used,
+    list_json_files,
+    touch,
+    write_json_atomically,
+)
+
+DAY = 24 * 60 * 60
+
+# Annual financials rarely change, estimates and ratios move more often
+DEFAULT_MAX_AGES = {
+    "stockanalysis.com": 7 * DAY,
+    "www.zacks.com": DAY,
+    "ycharts.com": DAY,
+}
+DEFAULT_MAX_AGE = DAY
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def get_validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HtmlCache:
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_age: Optional[float] = None,
+        max_ages: Optional[Dict[str, float]] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_ages = DEFAULT_MAX_AGES if max_ages is None else max_ages
+        self.max_size = max_size
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get_max_age(self, url: str) -> float:
+        if self.max_age is not None:
+            return self.max_age
+        return self.max_ages.get(urlparse(url).hostname, DEFAULT_MAX_AGE)
+
+    def is_fresh(self, entry: CacheEntry, max_age: Optional[float] = None) -> bool:
+        max_age = self.get_max_age(entry.url) if max_age is None else max_age
+        return time.time() - entry.fetched_at < max_age
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._get_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                entry = CacheEntry(**json.load(cache_file))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+        if entry.url != url:
+            return None
+        touch(path)
+        return entry
+
+    def put(self, url: str, html: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CacheEntry:
+        entry = CacheEntry(url=url, html=html, fetched_at=time.time(), etag=etag, last_modified=last_modified)
+        self._write(entry)
+        return entry
+
+    def revalidate(self, entry: CacheEntry) -> CacheEntry:
+        # The server confirmed the cached page (304 Not Modified), so it counts as freshly fetched again
+        entry.fetched_at = time.time()
+        self._write(entry)
+        return entry
+
+    def _write(self, entry: CacheEntry):
+        path = self._get_path(entry.url)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        write_json_atomically(path, asdict(entry))
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._get_total_size()
+            else:
+                self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _get_total_size(self) -> int:
+        return sum(stat.st_size for stat, _ in list_json_files(self.cache_dir))
+
+    def _evict(self):
+        # Remove least recently used entries until the cache is at 90% of its maximum size
+        self._size = evict_least_recently_used(
+            self.cache_dir, self._size, self.max_size * 0.9, get_size=lambda stat: stat.st_size
+        )
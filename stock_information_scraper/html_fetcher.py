@@ -1,7 +1,13 @@
-import time
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
 
-import requests
+from stock_information_scraper.http_client import HttpClient, create_session
+from stock_information_scraper.refresh_policy import RefreshPolicy
+from stock_information_scraper.retry_policy import FetchError
 
 
 @dataclass
@@ -17,69 +23,194 @@ class SourceHtmls:
     pe_max_html: str
 
 
-def _fetch_html(url: str) -> str:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/54.0.2840.90 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
-    while response.status_code != 200:
-        print("Still loading...")
-        time.sleep(10)
-        response = requests.get(url, headers=headers)
-    return response.text
+@dataclass(frozen=True)
+class BaseUrls:
+    stock_analysis: str = "https://stockanalysis.com/stocks"
+    zacks: str = "https://www.zacks.com/stock/quote"
+    ycharts: str = "https://ycharts.com/companies"
+
+    @classmethod
+    def local(cls, root_url: str) -> "BaseUrls":
+        # All three sites served by one stand-in, e.g. the replay server at http://127.0.0.1:8000
+        root_url = root_url.rstrip("/")
+        return cls(
+            stock_analysis=f"{root_url}/stocks",
+            zacks=f"{root_url}/stock/quote",
+            ycharts=f"{root_url}/companies",
+        )
+
+
+@dataclass
+class SourcePage:
+    field: str
+    description: str
+    url: str
+
+
+def _load_source_pages(client: HttpClient, url: str, pages: List[SourcePage], max_age: Optional[float] = None) -> str:
+    html = client.fetch_html(url=url, max_age=max_age)
+    print(f"Loaded {', '.join(page.description for page in pages)} from {url}")
+    return html
+
+
+def create_request_plan(pages: List[SourcePage]) -> Dict[str, List[SourcePage]]:
+    # Several fields are read from the same page, so each distinct URL only has to be fetched once
+    plan: Dict[str, List[SourcePage]] = {}
+    for page in pages:
+        plan.setdefault(page.url, []).append(page)
+    return plan
 
 
 class HtmlFetcher:
 
-    def __init__(self, ticker: str):
+    def __init__(
+        self,
+        ticker: str,
+        client: Optional[HttpClient] = None,
+        base_urls: BaseUrls = BaseUrls(),
+        refresh_policy: Optional[RefreshPolicy] = None,
+    ):
         self.ticker = ticker
-
-    def get_source_htmls(self) -> SourceHtmls:
-        stock_analysis_base_url = "https://stockanalysis.com/stocks"
-        zack_base_url = "https://www.zacks.com/stock/quote"
-        ycharts_base_url = "https://ycharts.com/companies"
+        self.client = client if client is not None else HttpClient()
+        self.base_urls = base_urls
+        self.refresh_policy = refresh_policy
+
+    def get_source_pages(self) -> List[SourcePage]:
+        stock_analysis_base_url = self.base_urls.stock_analysis
+        zack_base_url = self.base_urls.zacks
+        ycharts_base_url = self.base_urls.ycharts
         ticker = self.ticker
 
-        roic_url = f"{stock_analysis_base_url}/{ticker}/financials/ratios/"
-        roic_html = _fetch_html(url=roic_url)
-        print(f"Loaded Return on ROIC from {roic_url}")
-
-        book_value_url = f"{stock_analysis_base_url}/{ticker}/financials/balance-sheet/"
-        book_value_html = _fetch_html(url=book_value_url)
-        print(f"Loaded Book Value per Share from {book_value_url}")
-
-        eps_url = f"{stock_analysis_base_url}/{ticker}/financials/"
-        eps_html = _fetch_html(url=eps_url)
-        print(f"Loaded EPS Diluted from {eps_url}")
-
-        revenue_url = f"{stock_analysis_base_url}/{ticker}/financials/"
-        revenue_html = _fetch_html(url=revenue_url)
-        print(f"Loaded Revenue from {revenue_url}")
-
-        cash_flow_url = f"{stock_analysis_base_url}/{ticker}/financials/cash-flow-statement/"
-        cash_flow_html = _fetch_html(url=cash_flow_url)
-        print(f"Loaded Free Cash Flow per Share from {cash_flow_url}")
-
-        growth_estimates_url = f"{zack_base_url}/{ticker}/detailed-earning-estimates"
-        growth_estimates_html = _fetch_html(url=growth_estimates_url)
-        print(f"Loaded Growth Estimates from {growth_estimates_url}")
-
-        pe_min_url = f"{ycharts_base_url}/{ticker}/pe_ratio"
-        pe_min_html = _fetch_html(url=pe_min_url)
-        print(f"Loaded PE Ratio MIN from {pe_min_url}")
-
-        pe_max_url = f"{ycharts_base_url}/{ticker}/pe_ratio"
-        pe_max_html = _fetch_html(url=pe_max_url)
-        print(f"Loaded PE Ratio MAX from {pe_max_url}")
-
-        return SourceHtmls(
-            ticker=ticker,
-            roic_html=roic_html,
-            book_value_html=book_value_html,
-            eps_html=eps_html,
-            revenue_html=revenue_html,
-            cash_flow_html=cash_flow_html,
-            growth_estimates_html=growth_estimates_html,
-            pe_min_html=pe_min_html,
-            pe_max_html=pe_max_html,
+        return [
+            SourcePage(
+                field="roic_html",
+                description="Return on ROIC",
+                url=f"{stock_analysis_base_url}/{ticker}/financials/ratios/",
+            ),
+            SourcePage(
+                field="book_value_html",
+                description="Book Value per Share",
+                url=f"{stock_analysis_base_url}/{ticker}/financials/balance-sheet/",
+            ),
+            SourcePage(
+                field="eps_html",
+                description="EPS Diluted",
+                url=f"{stock_analysis_base_url}/{ticker}/financials/",
+            ),
+            SourcePage(
+                field="revenue_html",
+                description="Revenue",
+                url=f"{stock_analysis_base_url}/{ticker}/financials/",
+            ),
+            SourcePage(
+                field="cash_flow_html",
+                description="Free Cash Flow per Share",
+                url=f"{stock_analysis_base_url}/{ticker}/financials/cash-flow-statement/",
+            ),
+            SourcePage(
+                field="growth_estimates_html",
+                description="Growth Estimates",
+                url=f"{zack_base_url}/{ticker}/detailed-earning-estimates",
+            ),
+            SourcePage(
+                field="pe_min_html",
+                description="PE Ratio MIN",
+                url=f"{ycharts_base_url}/{ticker}/pe_ratio",
+            ),
+            SourcePage(
+                field="pe_max_html",
+                description="PE Ratio MAX",
+                url=f"{ycharts_base_url}/{ticker}/pe_ratio",
+            ),
+        ]
+
+    def get_request_plan(self) -> Dict[str, List[SourcePage]]:
+        return create_request_plan(self.get_source_pages())
+
+    def get_max_age(self, pages: List[SourcePage]) -> Optional[float]:
+        if self.refresh_policy is None:
+            return None
+        return self.refresh_policy.get_max_age(self.ticker, [page.field for page in pages])
+
+    def get_source_htmls(self) -> SourceHtmls:
+        htmls = {}
+        for url, pages in self.get_request_plan().items():
+            html = _load_source_pages(self.client, url=url, pages=pages, max_age=self.get_max_age(pages))
+            for page in pages:
+                htmls[page.field] = html
+        return SourceHtmls(ticker=self.ticker, **htmls)
+
+
+class ConcurrentHtmlFetcher:
+
+    def __init__(
+        self,
+        tickers: Iterable[str],
+        max_workers: int = 8,
+        client: Optional[HttpClient] = None,
+        max_pending_tickers: Optional[int] = None,
+        base_urls: BaseUrls = BaseUrls(),
+        refresh_policy: Optional[RefreshPolicy] = None,
+    ):
+        self.tickers = tickers
+        self.base_urls = base_urls
+        self.refresh_policy = refresh_policy
+        self.max_workers = max_workers
+        self.max_pending_tickers = max_pending_tickers if max_pending_tickers is not None else 2 * max_workers
+        # All workers share one client, so its connection pools need room for every worker
+        self.client = client if client is not None else HttpClient(session=create_session(pool_maxsize=max_workers))
+        self.failures: Dict[str, FetchError] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.RLock()
+
+    def _submit(self, executor: Executor, url: str, pages: List[SourcePage], max_age: Optional[float] = None) -> Future:
+        # Requests for a URL that is already being fetched share the pending future
+        with self._in_flight_lock:
+            future = self._in_flight.get(url)
+            if future is None:
+                future = executor.submit(_load_source_pages, self.client, url, pages, max_age)
+                self._in_flight[url] = future
+                future.add_done_callback(lambda _: self._forget(url))
+            return future
+
+    def _forget(self, url: str):
+        with self._in_flight_lock:
+            self._in_flight.pop(url, None)
+
+    def _submit_ticker(self, executor: Executor, ticker: str) -> Dict[str, Future]:
+        futures = {}
+        fetcher = HtmlFetcher(
+            ticker=ticker, client=self.client, base_urls=self.base_urls, refresh_policy=self.refresh_policy
         )
+        for url, pages in fetcher.get_request_plan().items():
+            future = self._submit(executor, url=url, pages=pages, max_age=fetcher.get_max_age(pages))
+            for page in pages:
+                futures[page.field] = future
+        return futures
+
+    def iter_source_htmls(self) -> Iterator[SourceHtmls]:
+        # All pages of all tickers share one pool, so max_workers limits the requests in flight globally.
+        # Only max_pending_tickers are fetched ahead of the consumer, so memory does not grow with the ticker list.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tickers = iter(self.tickers)
+            pending = deque(
+                (ticker, self._submit_ticker(executor, ticker))
+                for ticker in itertools.islice(tickers, self.max_pending_tickers)
+            )
+            while pending:
+                ticker, futures = pending.popleft()
+                next_ticker = next(tickers, None)
+                if next_ticker is not None:
+                    pending.append((next_ticker, self._submit_ticker(executor, next_ticker)))
+
+                try:
+                    htmls = {field: future.result() for field, future in futures.items()}
+                except FetchError as error:
+                    # Skip the ticker, the remaining ones can still be processed
+                    print(f"Skipping {ticker}: {error}")
+                    self.failures[ticker] = error
+                    continue
+                yield SourceHtmls(ticker=ticker, **htmls)
+
+    def get_source_htmls_list(self) -> List[SourceHtmls]:
+        return list(self.iter_source_htmls())
@@ -0,0 +1,133 @@
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.metrics import Metrics, measure_stage
+from stock_information_scraper.rate_limiter import HostRateLimiter
+from stock_information_scraper.retry_policy import FetchError, RetryPolicy
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/54.0.2840.90 Safari/537.36"
+DEFAULT_TIMEOUT = (5.0, 30.0)  # (connect, read) in seconds
+
+
+def create_session(pool_maxsize: int = 10, pool_connections: int = 3) -> requests.Session:
+    # One keep-alive pool per host: stockanalysis.com, zacks.com and ycharts.com
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": USER_AGENT,
+            # Contains br (and zstd) when urllib3 has a decoder for it installed
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        }
+    )
+    return session
+
+
+def get_wire_size(response: requests.Response) -> int:
+    # Bytes as they came over the network, before gzip or brotli decoding. urllib3 counts them while reading the body,
+    # Content-Length and the decoded size are the fallbacks for responses without a raw stream.
+    content = response.content
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None and content_length.isdigit():
+        return int(content_length)
+    return len(content)
+
+
+class HttpClient:
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        cache: Optional[HtmlCache] = None,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.session = session if session is not None else create_session()
+        self.cache = cache
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+
+    def fetch_html(self, url: str, max_age: Optional[float] = None) -> str:
+        # max_age overrides how long the cache may serve the page without asking the server
+        with measure_stage(self.metrics, "fetch"):
+            return self._fetch_html(url, max_age=max_age)
+
+    def _count_cache(self, result: str):
+        if self.metrics and self.cache:
+            self.metrics.count_cache(result)
+
+    def _fetch_html(self, url: str, max_age: Optional[float]) -> str:
+        cache = self.cache
+        cache_entry = cache.get(url) if cache else None
+        if cache_entry and cache.is_fresh(cache_entry, max_age=max_age):
+            self._count_cache("hit")
+            return cache_entry.html
+
+        headers = cache_entry.get_validators() if cache_entry else {}
+        response = self._get_with_retries(url, headers=headers, accept_not_modified=cache_entry is not None)
+
+        if response.status_code == 304:
+            self._count_cache("revalidated")
+            return cache.revalidate(cache_entry).html
+        self._count_cache("miss")
+        if cache:
+            cache.put(
+                url,
+                response.text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response.text
+
+    def _get_with_retries(self, url: str, headers: Dict[str, str], accept_not_modified: bool) -> requests.Response:
+        policy = self.retry_policy
+        metrics = self.metrics
+        host = urlparse(url).hostname
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempt > 1 and metrics:
+                metrics.count_retry(host)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(url)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as error:
+                if metrics:
+                    metrics.observe_request(host, time.perf_counter() - start, status_code=None)
+                if not policy.should_retry(attempt):
+                    raise FetchError(url, attempts=attempt, reason=str(error)) from error
+                delay = policy.get_delay(attempt)
+                print(f"Still loading {url} ({error.__class__.__name__}), retrying in {delay:.1f}s...")
+            else:
+                if metrics:
+                    metrics.observe_request(
+                        host, time.perf_counter() - start, response.status_code, size=get_wire_size(response)
+                    )
+                if response.status_code == 200 or (accept_not_modified and response.status_code == 304):
+                    return response
+                if not policy.should_retry(attempt, status_code=response.status_code):
+                    raise FetchError(url, attempts=attempt, status_code=response.status_code)
+                delay = policy.get_delay(attempt, retry_after=response.headers.get("Retry-After"))
+                print(f"Still loading {url} (status {response.status_code}), retrying in {delay:.1f}s...")
+            policy.sleep(delay)
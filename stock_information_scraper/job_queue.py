@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_LEASE_SECONDS = 300.0
+
+
+class JobQueue:
+    # One row per ticker in a SQLite file that all workers share. A worker leases a few tickers at a time and
+    # keeps extending the lease while it works on them; when it dies the lease runs out and another worker
+    # picks the tickers up.
+
+    def __init__(
+        self,
+        db_path: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ticker TEXT NOT NULL UNIQUE,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+                """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads, e.g. with the heartbeat thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.db_path, timeout=60)
+        return connection
+
+    def add(self, tickers: List[str]) -> int:
+        with self._connect() as connection:
+            cursor = connection.executemany("INSERT OR IGNORE INTO jobs (ticker) VALUES (?)", [(t,) for t in tickers])
+            return cursor.rowcount
+
+    def lease(self, worker: str, count: int = 1, max_attempts: int = 3) -> List[str]:
+        now = self._clock()
+        connection = self._connect()
+        # BEGIN IMMEDIATE takes the write lock right away, so two workers never lease the same ticker
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # A ticker whose leases keep running out (e.g. because it kills every worker) is not handed out again
+            connection.execute(
+                """
+                UPDATE jobs SET status = ?, error = ?, lease_expires = NULL
+                WHERE status = ? AND lease_expires < ? AND attempts >= ?
+                """,
+                (FAILED, f"Lease ran out {max_attempts} times", LEASED, now, max_attempts),
+            )
+            rows = connection.execute(
+                """
+                SELECT ticker FROM jobs
+                WHERE status = ? OR (status = ? AND lease_expires < ?)
+                ORDER BY position LIMIT ?
+                """,
+                (PENDING, LEASED, now, count),
+            ).fetchall()
+            tickers = [row[0] for row in rows]
+            connection.executemany(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE ticker = ?",
+                [(LEASED, worker, now + self.lease_seconds, ticker) for ticker in tickers],
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return tickers
+
+    def heartbeat(self, worker: str) -> int:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE status = ? AND worker = ?",
+                (self._clock() + self.lease_seconds, LEASED, worker),
+            )
+            return cursor.rowcount
+
+    def complete(self, worker: str, ticker: str) -> bool:
+        # Only the worker that holds the lease can finish a ticker, a worker that lost its lease is ignored
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, lease_expires = NULL WHERE ticker = ? AND status = ? AND worker = ?",
+                (DONE, ticker, LEASED, worker),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, worker: str, ticker: str, error: str, max_attempts: int = 3) -> bool:
+        # Returns the ticker to the queue until it has been tried max_attempts times
+        with self._connect() as connection:
+            cursor = connection.execute(
+                """
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, lease_expires = NULL
+                WHERE ticker = ? AND status = ? AND worker = ?
+                """,
+                (max_attempts, FAILED, PENDING, error, ticker, LEASED, worker),
+            )
+            return cursor.rowcount == 1
+
+    def get_counts(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in (PENDING, LEASED, DONE, FAILED)} | dict(rows)
+
+    def get_tickers(self, status: Optional[str] = None) -> List[str]:
+        # In the order they were added
+        if status is None:
+            rows = self._connect().execute("SELECT ticker FROM jobs ORDER BY position").fetchall()
+        else:
+            rows = (
+                self._connect()
+                .execute("SELECT ticker FROM jobs WHERE status = ? ORDER BY position", (status,))
+                .fetchall()
+            )
+        return [row[0] for row in rows]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class Heartbeat:
+    # Extends the leases of a worker in the background for as long as it is working on them
+
+    def __init__(self, queue: JobQueue, worker: str, interval: Optional[float] = None):
+        self.queue = queue
+        self.worker = worker
+        self.interval = interval if interval is not None else queue.lease_seconds / 3
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                self.queue.heartbeat(self.worker)
+        finally:
+            self.queue.close()
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
@@ -1,9 +1,21 @@
 import argparse
+from datetime import date
 from typing import List
 
-from stock_information_scraper.csv_generator import CsvGenerator
-from stock_information_scraper.html_fetcher import HtmlFetcher
-from stock_information_scraper.stock_information import StockInformationGenerator
+from stock_information_scraper.columnar_generator import ColumnarGenerator
+from stock_information_scraper.csv_generator import CsvGenerator, read_max_years, read_written_tickers
+from stock_information_scraper.html_archive import HtmlArchive, archive_source_htmls
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.html_fetcher import BaseUrls, ConcurrentHtmlFetcher
+from stock_information_scraper.http_client import HttpClient, create_session
+from stock_information_scraper.metrics import Metrics
+from stock_information_scraper.parser_backend import AUTO, PARSERS
+from stock_information_scraper.pipeline import parallel_parse_stage, parse_stage
+from stock_information_scraper.rate_limiter import DEFAULT_RATE_LIMITS, HostRateLimiter, parse_rate_limit
+from stock_information_scraper.refresh_policy import RefreshPolicy
+from stock_information_scraper.replay_server import record_source_htmls
+from stock_information_scraper.result_cache import ResultCache
+from stock_information_scraper.retry_policy import RetryPolicy
 
 
 def create_tickers(ticker_file_path: str) -> List[str]:
@@ -26,27 +38,145 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-t", "--ticker_file", type=str, help="Path to a ticker file.", nargs="?")
     parser.add_argument("-o", "--out_file", type=str, help="Name of CSV output file.", nargs="?")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=1, help="Maximum number of pages fetched at the same time."
+    )
+    parser.add_argument("--cache-dir", type=str, help="Directory to cache fetched pages in.", nargs="?")
+    parser.add_argument(
+        "--max-age", type=float, help="Seconds a cached page is used without asking the server again.", nargs="?"
+    )
+    parser.add_argument("--max-attempts", type=int, default=5, help="Maximum number of attempts per page.")
+    parser.add_argument(
+        "--rate-limit",
+        type=parse_rate_limit,
+        action="append",
+        default=[],
+        help="Requests per second and burst for a host, e.g. ycharts.com=0.5:2. Can be repeated.",
+    )
+    parser.add_argument("--parser", type=str, choices=PARSERS, default=AUTO, help="HTML parser to extract values with.")
+    parser.add_argument(
+        "-p", "--processes", type=int, default=0, help="Number of processes to parse pages in, 0 parses in-process."
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Append to the output file and skip tickers that are already in it."
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["csv", "npz"],
+        default="csv",
+        help="Output format, npz writes typed columns that numpy.load can read.",
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        help="Fetch all pages from one stand-in for the live sites, e.g. the replay server at http://127.0.0.1:8000.",
+        nargs="?",
+    )
+    parser.add_argument(
+        "--record-dir", type=str, help="Directory to save all fetched pages in, for the replay server.", nargs="?"
+    )
+    parser.add_argument(
+        "--refresh",
+        type=str,
+        choices=["full", "incremental"],
+        default="full",
+        help="incremental reuses cached pages that are unlikely to have changed since the last run in the output file.",
+    )
+    parser.add_argument(
+        "--result-cache-dir",
+        type=str,
+        help="Directory to store extracted values in, tickers with unchanged pages are not parsed again.",
+        nargs="?",
+    )
+    parser.add_argument(
+        "--archive-dir", type=str, help="Directory of the compressed archive of all fetched pages.", nargs="?"
+    )
+    parser.add_argument(
+        "--from-archive",
+        type=date.fromisoformat,
+        help="Extract the values from the pages archived on this date (YYYY-MM-DD) instead of fetching them.",
+        nargs="?",
+    )
+    parser.add_argument("--metrics-file", type=str, help="File to write fetch and parse metrics to.", nargs="?")
+    parser.add_argument(
+        "--metrics-format",
+        type=str,
+        choices=["json", "prometheus"],
+        default="json",
+        help="Format of the metrics file, prometheus writes a textfile for the node_exporter.",
+    )
     args = parser.parse_args()
+    if args.resume and args.format != "csv":
+        parser.error("--resume only works with --format csv")
+    if args.refresh == "incremental" and (not args.cache_dir or args.format != "csv"):
+        parser.error("--refresh incremental needs --cache-dir and --format csv")
+    if args.from_archive and not args.archive_dir:
+        parser.error("--from-archive needs --archive-dir")
 
     # Get list of tickers
     ticker_file_path = args.ticker_file
     tickers = create_tickers(ticker_file_path=ticker_file_path)
+    output_file = args.out_file if args.out_file else f'numbers_{"-".join(tickers)}.{args.format}'
+    if args.resume:
+        written_tickers = read_written_tickers(output_file)
+        tickers = [ticker for ticker in tickers if ticker not in written_tickers]
+        print(f"Resuming {output_file}: {len(written_tickers)} tickers already written, {len(tickers)} to go")
+
+    # Compare with the previous run before the output file is written again
+    refresh_policy = None
+    if args.refresh == "incremental":
+        refresh_policy = RefreshPolicy(previous_max_years=read_max_years(output_file))
+        current = [ticker for ticker in tickers if refresh_policy.has_current_financials(ticker)]
+        print(f"Incremental refresh: {len(current)} of {len(tickers)} tickers already have their latest fiscal year")
 
     # For each ticker get HtmlSources
-    source_html_list = []
-    for ticker in tickers:
-        html_fetcher = HtmlFetcher(ticker=ticker)
-        htmls = html_fetcher.get_source_htmls()
-        source_html_list.append(htmls)
+    metrics = Metrics() if args.metrics_file else None
+    cache = HtmlCache(cache_dir=args.cache_dir, max_age=args.max_age) if args.cache_dir else None
+    client = HttpClient(
+        session=create_session(pool_maxsize=args.concurrency),
+        cache=cache,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts),
+        rate_limiter=HostRateLimiter(rate_limits={**DEFAULT_RATE_LIMITS, **dict(args.rate_limit)}),
+        metrics=metrics,
+    )
+    base_urls = BaseUrls.local(args.base_url) if args.base_url else BaseUrls()
+    html_fetcher = ConcurrentHtmlFetcher(
+        tickers=tickers,
+        max_workers=args.concurrency,
+        client=client,
+        base_urls=base_urls,
+        refresh_policy=refresh_policy,
+    )
+    archive = HtmlArchive(archive_dir=args.archive_dir) if args.archive_dir else None
+    if args.from_archive:
+        source_htmls = archive.iter_source_htmls(tickers, fetched_on=args.from_archive)
+    else:
+        source_htmls = html_fetcher.iter_source_htmls()
+        if archive:
+            source_htmls = archive_source_htmls(source_htmls, archive=archive)
+    if args.record_dir:
+        source_htmls = record_source_htmls(source_htmls, record_dir=args.record_dir)
 
     # For each ticker get StockInformation from HtmlSources
-    stock_information_list = []
-    for source_html in source_html_list:
-        stock_information_generator = StockInformationGenerator(source_htmls=source_html)
-        stock_information = stock_information_generator.get_stock_information()
-        stock_information_list.append(stock_information)
-
-    # Put all StockInformation in CsvGenerator
-    output_file = args.out_file if args.out_file else f'numbers_{"-".join(tickers)}.csv'
-    csv_generator = CsvGenerator(stock_information_list=stock_information_list)
-    csv_generator.save_csv(file_name=output_file)
+    result_cache = ResultCache(cache_dir=args.result_cache_dir) if args.result_cache_dir else None
+    if args.processes > 0:
+        stock_information = parallel_parse_stage(
+            source_htmls, processes=args.processes, parser=args.parser, metrics=metrics, result_cache=result_cache
+        )
+    else:
+        stock_information = parse_stage(source_htmls, parser=args.parser, metrics=metrics, result_cache=result_cache)
+
+    # Stream all StockInformation through the CsvGenerator, each ticker is written as soon as it is ready
+    if args.format == "npz":
+        ColumnarGenerator(stock_information_list=stock_information).save_npz(file_name=output_file)
+    elif args.resume:
+        CsvGenerator(stock_information_list=stock_information, metrics=metrics).append_csv(file_name=output_file)
+    else:
+        CsvGenerator(stock_information_list=stock_information, metrics=metrics).save_csv(file_name=output_file)
+    if html_fetcher.failures:
+        print(f"Tickers that could not be loaded: {', '.join(html_fetcher.failures)}")
+    if archive:
+        archive.close()
+    if metrics:
+        metrics.write_report(args.metrics_file, report_format=args.metrics_format)
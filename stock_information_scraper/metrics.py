@@ -0,0 +1,187 @@
+import contextlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import ContextManager, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, like the Prometheus client defaults but with room for slow retries
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+CACHE_RESULTS = ("hit", "revalidated", "miss")
+ERROR_STATUS = "error"  # Requests that got no response at all, e.g. timeouts
+
+
+@dataclass
+class Histogram:
+    buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = self.counts or [0] * len(self.buckets)
+
+    def observe(self, value: float):
+        for index, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def get_cumulative_counts(self) -> List[int]:
+        cumulative, total = [], 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+@dataclass
+class HostMetrics:
+    latency: Histogram = field(default_factory=Histogram)
+    bytes: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+
+
+@dataclass
+class StageMetrics:
+    cpu_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    calls: int = 0
+
+
+def _format_bound(upper_bound: float) -> str:
+    return "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+
+
+class Metrics:
+
+    def __init__(self):
+        self.hosts: Dict[str, HostMetrics] = {}
+        self.cache: Dict[str, int] = {result: 0 for result in CACHE_RESULTS}
+        self.stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get_host(self, host: str) -> HostMetrics:
+        host_metrics = self.hosts.get(host)
+        if host_metrics is None:
+            host_metrics = self.hosts[host] = HostMetrics()
+        return host_metrics
+
+    def observe_request(self, host: str, seconds: float, status_code: Optional[int], size: int = 0):
+        status = ERROR_STATUS if status_code is None else str(status_code)
+        with self._lock:
+            host_metrics = self._get_host(host)
+            host_metrics.latency.observe(seconds)
+            host_metrics.bytes += size
+            host_metrics.status_codes[status] = host_metrics.status_codes.get(status, 0) + 1
+
+    def count_retry(self, host: str):
+        with self._lock:
+            self._get_host(host).retries += 1
+
+    def count_cache(self, result: str):
+        with self._lock:
+            self.cache[result] += 1
+
+    def add_stage_time(self, stage: str, cpu_seconds: float, wall_seconds: float, calls: int = 1):
+        with self._lock:
+            stage_metrics = self.stages.get(stage)
+            if stage_metrics is None:
+                stage_metrics = self.stages[stage] = StageMetrics()
+            stage_metrics.cpu_seconds += cpu_seconds
+            stage_metrics.wall_seconds += wall_seconds
+            stage_metrics.calls += calls
+
+    def merge_stages(self, stages: Dict[str, StageMetrics]):
+        # For stage times measured in worker processes
+        for stage, stage_metrics in stages.items():
+            self.add_stage_time(stage, stage_metrics.cpu_seconds, stage_metrics.wall_seconds, stage_metrics.calls)
+
+    @contextlib.contextmanager
+    def stage(self, stage: str):
+        # thread_time only counts the current thread, so concurrent fetches do not inflate each other
+        cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.thread_time() - cpu_start, time.perf_counter() - wall_start)
+
+    def get_cache_hit_ratio(self) -> Optional[float]:
+        lookups = sum(self.cache.values())
+        return (self.cache["hit"] + self.cache["revalidated"]) / lookups if lookups else None
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "hosts": {
+                    host: {
+                        "latency_seconds": {
+                            "buckets": dict(
+                                zip(map(_format_bound, host_metrics.latency.buckets), host_metrics.latency.counts)
+                            ),
+                            "sum": host_metrics.latency.sum,
+                            "count": host_metrics.latency.count,
+                        },
+                        "bytes": host_metrics.bytes,
+                        "status_codes": dict(host_metrics.status_codes),
+                        "retries": host_metrics.retries,
+                    }
+                    for host, host_metrics in self.hosts.items()
+                },
+                "cache": {**self.cache, "hit_ratio": self.get_cache_hit_ratio()},
+                "stages": {
+                    stage: {
+                        "cpu_seconds": stage_metrics.cpu_seconds,
+                        "wall_seconds": stage_metrics.wall_seconds,
+                        "calls": stage_metrics.calls,
+                    }
+                    for stage, stage_metrics in self.stages.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        # Text exposition format, e.g. for the node_exporter textfile collector
+        lines = []
+        with self._lock:
+            lines.append("# TYPE scraper_request_duration_seconds histogram")
+            for host, host_metrics in self.hosts.items():
+                latency = host_metrics.latency
+                for upper_bound, count in zip(latency.buckets, latency.get_cumulative_counts()):
+                    lines.append(
+                        f'scraper_request_duration_seconds_bucket{{host="{host}",le="{_format_bound(upper_bound)}"}} '
+                        f"{count}"
+                    )
+                lines.append(f'scraper_request_duration_seconds_sum{{host="{host}"}} {latency.sum}')
+                lines.append(f'scraper_request_duration_seconds_count{{host="{host}"}} {latency.count}')
+            lines.append("# TYPE scraper_response_bytes_total counter")
+            lines += [f'scraper_response_bytes_total{{host="{h}"}} {m.bytes}' for h, m in self.hosts.items()]
+            lines.append("# TYPE scraper_responses_total counter")
+            for host, host_metrics in self.hosts.items():
+                for status, count in host_metrics.status_codes.items():
+                    lines.append(f'scraper_responses_total{{host="{host}",status="{status}"}} {count}')
+            lines.append("# TYPE scraper_retries_total counter")
+            lines += [f'scraper_retries_total{{host="{h}"}} {m.retries}' for h, m in self.hosts.items()]
+            lines.append("# TYPE scraper_cache_lookups_total counter")
+            lines += [f'scraper_cache_lookups_total{{result="{r}"}} {c}' for r, c in self.cache.items()]
+            lines.append("# TYPE scraper_stage_cpu_seconds_total counter")
+            lines += [f'scraper_stage_cpu_seconds_total{{stage="{s}"}} {m.cpu_seconds}' for s, m in self.stages.items()]
+            lines.append("# TYPE scraper_stage_wall_seconds_total counter")
+            lines += [
+                f'scraper_stage_wall_seconds_total{{stage="{s}"}} {m.wall_seconds}' for s, m in self.stages.items()
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, file_name: str, report_format: str = "json"):
+        print(f"Metrics will be saved to {file_name}")
+        with open(file_name, "w") as report_file:
+            if report_format == "prometheus":
+                report_file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), report_file, indent=2)
+
+
+def measure_stage(metrics: Optional[Metrics], stage: str) -> ContextManager:
+    return metrics.stage(stage) if metrics is not None else contextlib.nullcontext()
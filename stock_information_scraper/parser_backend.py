@@ -0,0 +1,30 @@
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+AUTO = "auto"
+LXML = "lxml"
+HTML_PARSER = "html.parser"
+PARSERS = (AUTO, LXML, HTML_PARSER)
+
+
+def is_available(parser: str) -> bool:
+    return builder_registry.lookup(parser) is not None
+
+
+def resolve_parser(parser: str = AUTO) -> str:
+    # lxml parses in C and is much faster, the pure Python html.parser always works
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser '{parser}', choose one of {', '.join(PARSERS)}")
+    if parser == AUTO:
+        return LXML if is_available(LXML) else HTML_PARSER
+    if not is_available(parser):
+        print(f"Parser {parser} is not installed, falling back to {HTML_PARSER}")
+        return HTML_PARSER
+    return parser
+
+
+def parse_html(html: str, parser: str = HTML_PARSER, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    # With parse_only only the matching elements (and their children) end up in the tree
+    return BeautifulSoup(html, parser, parse_only=parse_only)
@@ -0,0 +1,105 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from stock_information_scraper.html_fetcher import SourceHtmls
+from stock_information_scraper.metrics import Metrics, StageMetrics
+from stock_information_scraper.parser_backend import AUTO, resolve_parser
+from stock_information_scraper.result_cache import ResultCache, get_result_key
+from stock_information_scraper.stock_information import StockInformation, StockInformationGenerator
+
+
+def _generate_stock_information(
+    source_htmls: SourceHtmls, parser: str, targeted: bool, metrics: Optional[Metrics] = None
+) -> StockInformation:
+    generator = StockInformationGenerator(source_htmls=source_htmls, parser=parser, targeted=targeted, metrics=metrics)
+    return generator.get_stock_information()
+
+
+def _generate_stock_information_with_stages(
+    source_htmls: SourceHtmls, parser: str, targeted: bool
+) -> Tuple[StockInformation, Dict[str, StageMetrics]]:
+    # Metrics cannot be shared with worker processes, so the stage times travel back with the result
+    metrics = Metrics()
+    stock_information = _generate_stock_information(source_htmls, parser=parser, targeted=targeted, metrics=metrics)
+    return stock_information, metrics.stages
+
+
+def _get_cached_result(
+    result_cache: Optional[ResultCache], source_htmls: SourceHtmls, parser: str, targeted: bool
+) -> Tuple[Optional[str], Optional[StockInformation]]:
+    # Tickers whose pages did not change since an earlier run are not parsed again
+    if result_cache is None:
+        return None, None
+    key = get_result_key(source_htmls, parser=parser, targeted=targeted)
+    stock_information = result_cache.get(key)
+    if stock_information is not None:
+        print(f"Reusing stored values of {source_htmls.ticker}, its pages did not change")
+    return key, stock_information
+
+
+def parse_stage(
+    source_htmls_iterable: Iterable[SourceHtmls],
+    parser: str = AUTO,
+    targeted: bool = True,
+    metrics: Optional[Metrics] = None,
+    result_cache: Optional[ResultCache] = None,
+) -> Iterator[StockInformation]:
+    # Each ticker's pages are released as soon as its StockInformation has been extracted
+    parser = resolve_parser(parser)
+    for source_htmls in source_htmls_iterable:
+        key, stock_information = _get_cached_result(result_cache, source_htmls, parser=parser, targeted=targeted)
+        if stock_information is None:
+            stock_information = _generate_stock_information(
+                source_htmls, parser=parser, targeted=targeted, metrics=metrics
+            )
+            if key is not None:
+                result_cache.put(key, stock_information)
+        yield stock_information
+
+
+def parallel_parse_stage(
+    source_htmls_iterable: Iterable[SourceHtmls],
+    processes: Optional[int] = None,
+    parser: str = AUTO,
+    targeted: bool = True,
+    max_pending: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+    result_cache: Optional[ResultCache] = None,
+) -> Iterator[StockInformation]:
+    # Parsing is CPU bound, so it runs in worker processes while the fetcher threads keep downloading.
+    # Results are yielded in input order; at most max_pending tickers wait in the pool.
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending if max_pending is not None else 2 * processes
+    parser = resolve_parser(parser)
+    generate = _generate_stock_information_with_stages if metrics is not None else _generate_stock_information
+
+    def _get_result(key: Optional[str], future: Future) -> StockInformation:
+        if metrics is None:
+            stock_information = future.result()
+        else:
+            stock_information, stages = future.result()
+            metrics.merge_stages(stages)
+        if key is not None:
+            result_cache.put(key, stock_information)
+        return stock_information
+
+    def _cached_future(stock_information: StockInformation) -> Future:
+        future = Future()
+        future.set_result(stock_information if metrics is None else (stock_information, {}))
+        return future
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending: Deque[Tuple[Optional[str], Future]] = deque()
+        for source_htmls in source_htmls_iterable:
+            key, stock_information = _get_cached_result(result_cache, source_htmls, parser=parser, targeted=targeted)
+            if stock_information is not None:
+                # Already done, it only waits for the tickers before it to keep the order
+                pending.append((None, _cached_future(stock_information)))
+            else:
+                pending.append((key, executor.submit(generate, source_htmls, parser, targeted)))
+            while pending and (len(pending) >= max_pending or pending[0][1].done()):
+                yield _get_result(*pending.popleft())
+        while pending:
+            yield _get_result(*pending.popleft())
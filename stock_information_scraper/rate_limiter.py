@@ -0,0 +1,95 @@
+import argparse
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    requests_per_second: float
+    burst: int = 1
+
+    def __post_init__(self):
+        # Checked here, so neither the command line nor code can create a TokenBucket that divides by zero
+        if not self.requests_per_second > 0:
+            raise ValueError(f"Requests per second must be greater than 0, got {self.requests_per_second}")
+        if self.burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {self.burst}")
+
+
+# zacks.com and ycharts.com throttle much earlier than stockanalysis.com
+DEFAULT_RATE_LIMITS = {
+    "stockanalysis.com": RateLimit(requests_per_second=5.0, burst=10),
+    "www.zacks.com": RateLimit(requests_per_second=1.0, burst=3),
+    "ycharts.com": RateLimit(requests_per_second=0.5, burst=2),
+}
+
+
+def parse_rate_limit(value: str) -> Tuple[str, RateLimit]:
+    # Format: HOST=REQUESTS_PER_SECOND[:BURST], e.g. ycharts.com=0.5:2
+    host, _, limit = value.partition("=")
+    requests_per_second, _, burst = limit.partition(":")
+    # argparse shows the message of an ArgumentTypeError, for a ValueError it only says the value is invalid
+    if not host or not requests_per_second:
+        raise argparse.ArgumentTypeError(f"Rate limit '{value}' is not in the format HOST=REQUESTS_PER_SECOND[:BURST]")
+    try:
+        return host, RateLimit(requests_per_second=float(requests_per_second), burst=int(burst) if burst else 1)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"Rate limit '{value}' is invalid: {error}") from error
+
+
+class TokenBucket:
+
+    def __init__(
+        self,
+        rate_limit: RateLimit,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate_limit = rate_limit
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(rate_limit.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        rate_limit = self.rate_limit
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                rate_limit.burst, self._tokens + (now - self._updated_at) * rate_limit.requests_per_second
+            )
+            self._updated_at = now
+            # Take the token right away, even if it is not there yet. A negative balance queues the
+            # callers, each one waits until its own token has been refilled.
+            self._tokens -= 1
+            wait = -self._tokens / rate_limit.requests_per_second if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+
+
+class HostRateLimiter:
+
+    def __init__(self, rate_limits: Optional[Dict[str, RateLimit]] = None, default: Optional[RateLimit] = None):
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, host: str) -> Optional[TokenBucket]:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate_limit = self.rate_limits.get(host, self.default)
+                if rate_limit is None:
+                    return None
+                bucket = self._buckets[host] = TokenBucket(rate_limit)
+            return bucket
+
+    def acquire(self, url: str):
+        bucket = self._get_bucket(urlparse(url).hostname)
+        if bucket is not None:
+            bucket.acquire()
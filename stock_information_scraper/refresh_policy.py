@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+DAY = 24 * 60 * 60
+
+# Pages with the annual financials, they only get a new year once the annual report is out
+FINANCIALS_FIELDS = ("roic_html", "book_value_html", "eps_html", "revenue_html", "cash_flow_html")
+
+# Once a ticker's latest fiscal year is in the previous output, its financials are only checked once a month
+# (for restatements). Until then they are checked every day, so the new year shows up soon after it is published.
+CURRENT_FINANCIALS_MAX_AGE = 30 * DAY
+DUE_FINANCIALS_MAX_AGE = DAY
+
+# Estimates and the P/E range over several years hardly move from one day to the next
+INCREMENTAL_MAX_AGES = {
+    "growth_estimates_html": 7 * DAY,
+    "pe_min_html": 7 * DAY,
+    "pe_max_html": 7 * DAY,
+}
+
+
+@dataclass
+class RefreshPolicy:
+    # Decides per ticker and page how old a cached page may be, based on the values of the previous run
+    previous_max_years: Dict[str, int]
+    current_year: int = field(default_factory=lambda: date.today().year)
+    max_ages: Dict[str, float] = field(default_factory=lambda: dict(INCREMENTAL_MAX_AGES))
+
+    def has_current_financials(self, ticker: str) -> bool:
+        # A max year of last year (or later, for fiscal years that already ended) is the newest there can be
+        max_year = self.previous_max_years.get(ticker)
+        return max_year is not None and max_year >= self.current_year - 1
+
+    def get_max_age(self, ticker: str, fields: Iterable[str]) -> Optional[float]:
+        # None leaves it to the cache, e.g. for tickers that were not in the previous output
+        if ticker not in self.previous_max_years:
+            return None
+        max_ages = []
+        for page_field in fields:
+            if page_field in FINANCIALS_FIELDS:
+                current = self.has_current_financials(ticker)
+                max_ages.append(CURRENT_FINANCIALS_MAX_AGE if current else DUE_FINANCIALS_MAX_AGE)
+            elif page_field in self.max_ages:
+                max_ages.append(self.max_ages[page_field])
+        # A URL shared by several fields is as fresh as its most demanding one
+        return min(max_ages) if max_ages else None
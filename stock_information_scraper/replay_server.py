@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from stock_information_scraper.html_fetcher import BaseUrls, SourceHtmls
+
+# URL endings of the source pages and the recorded page that answers them, stored as {ticker}_{source}.html
+REPLAY_PAGES = [
+    ("/financials/ratios/", "roic"),
+    ("/financials/balance-sheet/", "book_value"),
+    ("/financials/cash-flow-statement/", "cash_flow"),
+    ("/financials/", "eps"),
+    ("/detailed-earning-estimates", "growth_estimates"),
+    ("/pe_ratio", "pe_ratio_min"),
+]
+
+# The name each SourceHtmls field is recorded under, the same names as the fixtures in tests/data
+RECORDED_SOURCES = {
+    "roic_html": "roic",
+    "book_value_html": "book_value",
+    "eps_html": "eps",
+    "revenue_html": "revenue",
+    "cash_flow_html": "cash_flow",
+    "growth_estimates_html": "growth_estimates",
+    "pe_min_html": "pe_ratio_min",
+    "pe_max_html": "pe_ratio_max",
+}
+
+CHUNK_SIZE = 16 * 1024
+
+
+def find_recorded_page(path: str) -> Optional[Tuple[str, str]]:
+    # Returns (ticker, source) for the path of a source page
+    path = path.split("?")[0]
+    for ending, source in REPLAY_PAGES:
+        if path.endswith(ending):
+            ticker = path[: -len(ending)].rstrip("/").split("/")[-1]
+            if ticker:
+                return ticker, source
+            break
+    return None
+
+
+def record_source_htmls(source_htmls_iterable: Iterable[SourceHtmls], record_dir: str) -> Iterator[SourceHtmls]:
+    # Saves every page on the way through, so the replay server can serve the run again later
+    os.makedirs(record_dir, exist_ok=True)
+    for source_htmls in source_htmls_iterable:
+        for html_field, source in RECORDED_SOURCES.items():
+            file_name = os.path.join(record_dir, f"{source_htmls.ticker.lower()}_{source}.html")
+            with open(file_name, "w") as html_file:
+                html_file.write(getattr(source_htmls, html_field))
+        yield source_htmls
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0  # Seconds before every response
+    error_rate: float = 0.0  # Share of requests answered with one of error_status_codes
+    fail_first: int = 0  # The first requests of every page that get an error, for reproducible retries
+    error_status_codes: Tuple[int, ...] = (429, 503)
+    retry_after: Optional[int] = None
+    bytes_per_second: Optional[float] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class ReplayStats:
+    requests: List[str] = field(default_factory=list)
+    status_codes: Dict[int, int] = field(default_factory=dict)
+
+
+class ReplayServer:
+
+    def __init__(
+        self,
+        page_dirs: Iterable[str] = ("tests/data",),
+        faults: Optional[Faults] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.page_dirs = list(page_dirs)
+        self.faults = faults if faults is not None else Faults()
+        self.stats = ReplayStats()
+        self._random = random.Random(self.faults.seed)
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_urls(self) -> BaseUrls:
+        return BaseUrls.local(self.root_url)
+
+    def read_page(self, ticker: str, source: str) -> Optional[bytes]:
+        # Later directories win, so recorded pages can override the fixtures
+        for page_dir in reversed(self.page_dirs):
+            file_name = os.path.join(page_dir, f"{ticker.lower()}_{source}.html")
+            if os.path.exists(file_name):
+                with open(file_name, "rb") as html_file:
+                    return html_file.read()
+        return None
+
+    def _get_injected_error(self, path: str) -> Optional[int]:
+        faults = self.faults
+        with self._lock:
+            attempt = self._attempts[path] = self._attempts.get(path, 0) + 1
+            if attempt <= faults.fail_first or (faults.error_rate and self._random.random() < faults.error_rate):
+                return self._random.choice(faults.error_status_codes)
+        return None
+
+    def _count(self, path: str, status_code: int):
+        with self._lock:
+            self.stats.requests.append(path)
+            self.stats.status_codes[status_code] = self.stats.status_codes.get(status_code, 0) + 1
+
+    def _create_handler(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                faults = server.faults
+                if faults.latency:
+                    time.sleep(faults.latency)
+
+                error_status = server._get_injected_error(self.path)
+                if error_status is not None:
+                    headers = {"Retry-After": str(faults.retry_after)} if faults.retry_after is not None else {}
+                    return self._respond(error_status, b"", headers)
+
+                page = find_recorded_page(self.path)
+                html = server.read_page(*page) if page else None
+                if html is None:
+                    return self._respond(404, b"")
+
+                # Same validators as the live sites, so the cache can be benchmarked with revalidation
+                etag = f'"{hashlib.sha1(html).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._respond(304, b"", {"ETag": etag})
+                self._respond(200, html, {"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+
+            def _respond(self, status_code: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+                server._count(self.path, status_code)
+                self.send_response(status_code)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                bytes_per_second = server.faults.bytes_per_second
+                for start in range(0, len(body), CHUNK_SIZE):
+                    chunk = body[start : start + CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    if bytes_per_second:
+                        time.sleep(len(chunk) / bytes_per_second)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves recorded pages in place of the live sites.")
+    parser.add_argument(
+        "-d",
+        "--page-dir",
+        type=str,
+        action="append",
+        help="Directory with {ticker}_{source}.html pages. Can be repeated.",
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before every response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an error.")
+    parser.add_argument("--fail-first", type=int, default=0, help="Number of errors for the first requests of a page.")
+    parser.add_argument(
+        "--error-status", type=int, action="append", help="Status code of injected errors (default 429 and 503)."
+    )
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with injected errors.")
+    parser.add_argument("--bandwidth", type=float, help="Bytes per second of every response.")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    replay_server = ReplayServer(
+        page_dirs=args.page_dir or ["tests/data"],
+        faults=Faults(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            fail_first=args.fail_first,
+            error_status_codes=tuple(args.error_status or (429, 503)),
+            retry_after=args.retry_after,
+            bytes_per_second=args.bandwidth,
+            seed=args.seed,
+        ),
+        port=args.port,
+    )
+    with replay_server:
+        print(f"Replaying pages from {', '.join(replay_server.page_dirs)} at {replay_server.root_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import fields
+from typing import Optional
+
+import bs4
+
+import stock_information_scraper
+from stock_information_scraper import parser_backend, stock_information
+from stock_information_scraper.file_store import (
+    evict_least_recently_used,
+    list_json_files,
+    touch,
+    write_json_atomically,
+)
+from stock_information_scraper.html_fetcher import SourceHtmls
+from stock_information_scraper.stock_information import StockInformation
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def _get_extractor_version() -> str:
+    # Any change to the extraction code, the CSV headers or BeautifulSoup gives new keys, so old results are not reused
+    version = hashlib.sha256(bs4.__version__.encode("utf-8"))
+    for module in (stock_information_scraper, parser_backend, stock_information):
+        with open(module.__file__, "rb") as module_file:
+            version.update(module_file.read())
+    return version.hexdigest()
+
+
+EXTRACTOR_VERSION = _get_extractor_version()
+
+
+def get_result_key(source_htmls: SourceHtmls, parser: str, targeted: bool) -> str:
+    key = hashlib.sha256(f"{EXTRACTOR_VERSION}\0{parser}\0{targeted}".encode("utf-8"))
+    for source_field in fields(SourceHtmls):
+        key.update(b"\0")
+        key.update(getattr(source_htmls, source_field.name).encode("utf-8"))
+    return key.hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: Optional[int] = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[StockInformation]:
+        path = self._get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                values = json.load(cache_file)
+            stock_information = StockInformation.from_values(values)
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+        touch(path)
+        return stock_information
+
+    def put(self, key: str, stock_information: StockInformation):
+        path = self._get_path(key)
+        is_new = not os.path.exists(path)
+        write_json_atomically(path, list(stock_information.values))
+
+        with self._lock:
+            if self._entries is None:
+                self._entries = sum(1 for _ in list_json_files(self.cache_dir))
+            elif is_new:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Remove least recently used entries until the cache holds 90% of its maximum number of entries
+        self._entries = evict_least_recently_used(
+            self.cache_dir, self._entries, int(self.max_entries * 0.9), get_size=lambda stat: 1
+        )
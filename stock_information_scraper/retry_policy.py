@@ -0,0 +1,58 @@
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, FrozenSet, Optional
+
+# Rate limits and temporary server problems are worth another try, anything else (e.g. 404) is not
+RETRY_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class FetchError(Exception):
+
+    def __init__(self, url: str, attempts: int, status_code: Optional[int] = None, reason: str = ""):
+        self.url = url
+        self.attempts = attempts
+        self.status_code = status_code
+        self.reason = reason
+        details = f"status {status_code}" if status_code is not None else reason
+        super().__init__(f"Could not fetch {url} after {attempts} attempt(s): {details}")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 2.0
+    max_delay: float = 120.0
+    jitter: float = 0.5
+    retry_status_codes: FrozenSet[int] = RETRY_STATUS_CODES
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        return status_code is None or status_code in self.retry_status_codes
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        # Exponential backoff, randomly shortened by up to `jitter` so that workers do not retry in lockstep
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
@@ -1,16 +1,24 @@
+import hashlib
+import math
+from array import array
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from stock_information_scraper import CsvHeader
 from stock_information_scraper.html_fetcher import SourceHtmls
+from stock_information_scraper.metrics import Metrics, measure_stage
+from stock_information_scraper.parser_backend import AUTO, HTML_PARSER, parse_html, resolve_parser
 
 HEADERS = CsvHeader()
 
 
+MISSING_VALUES = {"-", "NA", "--"}
+
+
 def string_to_float(value: str) -> float:
-    if value not in {"-", "NA", "--"}:
+    if value not in MISSING_VALUES:
         return float(value.replace(",", ""))
 
 
@@ -18,6 +26,19 @@ def percent_to_float(value: str) -> float:
     return string_to_float(value.replace("%", ""))
 
 
+def strings_to_floats(values: Sequence[Optional[str]]) -> array:
+    # Bulk version of string_to_float, missing values (None, "-", "NA", "--") become NaN
+    return array("d", [math.nan if v is None or v in MISSING_VALUES else float(v.replace(",", "")) for v in values])
+
+
+def percents_to_floats(values: Sequence[Optional[str]]) -> array:
+    return strings_to_floats([None if v is None else v.replace("%", "") for v in values])
+
+
+def nan_to_none(values: Sequence[float]) -> List[Optional[float]]:
+    return [None if math.isnan(value) else value for value in values]
+
+
 @dataclass
 class SourceSoups:
     roic_soup: BeautifulSoup
@@ -30,118 +51,262 @@ class SourceSoups:
     pe_max_soup: BeautifulSoup
 
 
-def source_htmls_to_source_soups(sources: SourceHtmls) -> SourceSoups:
-    def _get_soup(html: str) -> BeautifulSoup:
-        return BeautifulSoup(html, "html.parser")
+# BeautifulSoup's select compiles each selector once and keeps it for the other tickers
+FINANCIALS_ROWS = 'table[data-test="financials"] > tbody > tr'
+FINANCIALS_HEADER_ROW = 'table[data-test="financials"] > thead > tr'
+GROWTH_ESTIMATES_ROWS = "#earnings_growth_estimates table > tbody > tr"
+
+# The only parts of the pages the extractors look at. Parsing just these keeps the trees small.
+FINANCIALS_STRAINER = SoupStrainer(["h1", "table"])
+GROWTH_ESTIMATES_STRAINER = SoupStrainer("div", id="earnings_growth_estimates")
+KEY_STATS_STRAINER = SoupStrainer("div", class_="key-stat")
+
+
+def source_htmls_to_source_soups(
+    sources: SourceHtmls, parser: str = HTML_PARSER, targeted: bool = False, metrics: Optional[Metrics] = None
+) -> SourceSoups:
+    with measure_stage(metrics, "parse"):
+        return _source_htmls_to_source_soups(sources, parser=parser, targeted=targeted)
+
+
+def _source_htmls_to_source_soups(sources: SourceHtmls, parser: str, targeted: bool) -> SourceSoups:
+    # Several fields are read from the same page (e.g. EPS and revenue), identical pages are parsed only once
+    soups: Dict[Tuple[str, int], BeautifulSoup] = {}
+
+    def _get_soup(html: str, strainer: SoupStrainer) -> BeautifulSoup:
+        parse_only = strainer if targeted else None
+        key = (hashlib.sha1(html.encode("utf-8")).hexdigest(), id(parse_only))
+        soup = soups.get(key)
+        if soup is None:
+            soup = soups[key] = parse_html(html, parser=parser, parse_only=parse_only)
+        return soup
 
     return SourceSoups(
-        roic_soup=_get_soup(sources.roic_html),
-        book_value_soup=_get_soup(sources.book_value_html),
-        eps_soup=_get_soup(sources.eps_html),
-        revenue_soup=_get_soup(sources.revenue_html),
-        cash_flow_soup=_get_soup(sources.cash_flow_html),
-        growth_estimates_soup=_get_soup(sources.growth_estimates_html),
-        pe_min_soup=_get_soup(sources.pe_min_html),
-        pe_max_soup=_get_soup(sources.pe_max_html),
+        roic_soup=_get_soup(sources.roic_html, FINANCIALS_STRAINER),
+        book_value_soup=_get_soup(sources.book_value_html, FINANCIALS_STRAINER),
+        eps_soup=_get_soup(sources.eps_html, FINANCIALS_STRAINER),
+        revenue_soup=_get_soup(sources.revenue_html, FINANCIALS_STRAINER),
+        cash_flow_soup=_get_soup(sources.cash_flow_html, FINANCIALS_STRAINER),
+        growth_estimates_soup=_get_soup(sources.growth_estimates_html, GROWTH_ESTIMATES_STRAINER),
+        pe_min_soup=_get_soup(sources.pe_min_html, KEY_STATS_STRAINER),
+        pe_max_soup=_get_soup(sources.pe_max_html, KEY_STATS_STRAINER),
     )
 
 
-@dataclass()
+@dataclass(frozen=True)
 class StockInformationEntry:
     csv_header: str
     value: Optional[Union[float, str]]
 
 
-@dataclass()
+YEARS = 10
+
+
+@dataclass(frozen=True)
+class SeriesRule:
+    # One row of a stockanalysis.com financials table, read for the last YEARS years
+    field: str
+    soup: str
+    row_title: str
+    bulk_cast_method: Callable[[Sequence[Optional[str]]], array] = strings_to_floats
+    skip_columns: int = 0
+    divisor: Optional[float] = None  # Values are divided and rounded to 2 digits, 0 then counts as missing
+    rows: str = FINANCIALS_ROWS
+
+
+@dataclass(frozen=True)
+class TableCellRule:
+    # The second cell of the first row whose first cell is the end of `label`
+    field: str
+    soup: str
+    label: str
+    rows: str
+    cast_method: Callable[[str], Optional[float]] = string_to_float
+
+
+@dataclass(frozen=True)
+class KeyStatRule:
+    # The title of the first "key-stat" div that mentions `label`
+    field: str
+    soup: str
+    label: str
+    cast_method: Callable[[str], Optional[float]] = string_to_float
+
+
+SERIES_RULES = (
+    SeriesRule("roic", "roic_soup", "Return on Capital (ROIC)", percents_to_floats, skip_columns=1),  # Skip "Current"
+    SeriesRule("book_value", "book_value_soup", "Book Value per Share"),
+    SeriesRule("eps", "eps_soup", "EPS (Diluted)"),
+    SeriesRule("revenue", "revenue_soup", "Revenue", divisor=1000.0),  # Millions to billions
+    SeriesRule("cash_flow", "cash_flow_soup", "Free Cash Flow Per Share"),
+)
+VALUE_RULES = (
+    TableCellRule(
+        "growth_estimates", "growth_estimates_soup", "Growth Estimates - Next 5 Years", GROWTH_ESTIMATES_ROWS
+    ),
+    KeyStatRule("pe_min", "pe_min_soup", "Minimum"),
+    KeyStatRule("pe_max", "pe_max_soup", "Maximum"),
+)
+SERIES = tuple(rule.field for rule in SERIES_RULES)
+
+
+def _series_fields(series: str):
+    return [f"{series}_max_year"] + [f"{series}_max_year_minus_{minus_years}" for minus_years in range(1, YEARS)]
+
+
 class StockInformation:
-    ticker: StockInformationEntry
-    company: StockInformationEntry
-    max_year: StockInformationEntry
-    roic_max_year: StockInformationEntry
-    roic_max_year_minus_1: StockInformationEntry
-    roic_max_year_minus_2: StockInformationEntry
-    roic_max_year_minus_3: StockInformationEntry
-    roic_max_year_minus_4: StockInformationEntry
-    roic_max_year_minus_5: StockInformationEntry
-    roic_max_year_minus_6: StockInformationEntry
-    roic_max_year_minus_7: StockInformationEntry
-    roic_max_year_minus_8: StockInformationEntry
-    roic_max_year_minus_9: StockInformationEntry
-    book_value_max_year: StockInformationEntry
-    book_value_max_year_minus_1: StockInformationEntry
-    book_value_max_year_minus_2: StockInformationEntry
-    book_value_max_year_minus_3: StockInformationEntry
-    book_value_max_year_minus_4: StockInformationEntry
-    book_value_max_year_minus_5: StockInformationEntry
-    book_value_max_year_minus_6: StockInformationEntry
-    book_value_max_year_minus_7: StockInformationEntry
-    book_value_max_year_minus_8: StockInformationEntry
-    book_value_max_year_minus_9: StockInformationEntry
-    eps_max_year: StockInformationEntry
-    eps_max_year_minus_1: StockInformationEntry
-    eps_max_year_minus_2: StockInformationEntry
-    eps_max_year_minus_3: StockInformationEntry
-    eps_max_year_minus_4: StockInformationEntry
-    eps_max_year_minus_5: StockInformationEntry
-    eps_max_year_minus_6: StockInformationEntry
-    eps_max_year_minus_7: StockInformationEntry
-    eps_max_year_minus_8: StockInformationEntry
-    eps_max_year_minus_9: StockInformationEntry
-    revenue_max_year: StockInformationEntry
-    revenue_max_year_minus_1: StockInformationEntry
-    revenue_max_year_minus_2: StockInformationEntry
-    revenue_max_year_minus_3: StockInformationEntry
-    revenue_max_year_minus_4: StockInformationEntry
-    revenue_max_year_minus_5: StockInformationEntry
-    revenue_max_year_minus_6: StockInformationEntry
-    revenue_max_year_minus_7: StockInformationEntry
-    revenue_max_year_minus_8: StockInformationEntry
-    revenue_max_year_minus_9: StockInformationEntry
-    cash_flow_max_year: StockInformationEntry
-    cash_flow_max_year_minus_1: StockInformationEntry
-    cash_flow_max_year_minus_2: StockInformationEntry
-    cash_flow_max_year_minus_3: StockInformationEntry
-    cash_flow_max_year_minus_4: StockInformationEntry
-    cash_flow_max_year_minus_5: StockInformationEntry
-    cash_flow_max_year_minus_6: StockInformationEntry
-    cash_flow_max_year_minus_7: StockInformationEntry
-    cash_flow_max_year_minus_8: StockInformationEntry
-    cash_flow_max_year_minus_9: StockInformationEntry
-    growth_estimates: StockInformationEntry
-    pe_min: StockInformationEntry
-    pe_max: StockInformationEntry
+    # Values are kept in one tuple per ticker, the field names and CSV headers only exist once on the class
+    __slots__ = ("_values", "_csv_headers")
+
+    FIELDS = tuple(
+        ["ticker", "company", "max_year"]
+        + [field for series in SERIES for field in _series_fields(series)]
+        + [rule.field for rule in VALUE_RULES]
+    )
+    CSV_HEADERS = tuple(HEADERS.to_list())
+
+    def __init__(self, **entries: StockInformationEntry):
+        if set(entries) != set(self.FIELDS):
+            missing = ", ".join(field for field in self.FIELDS if field not in entries)
+            unexpected = ", ".join(field for field in entries if field not in self.FIELDS)
+            raise TypeError(f"StockInformation got missing fields [{missing}] and unexpected fields [{unexpected}]")
+        self._values = tuple(entries[field].value for field in self.FIELDS)
+        csv_headers = tuple(entries[field].csv_header for field in self.FIELDS)
+        self._csv_headers = self.CSV_HEADERS if csv_headers == self.CSV_HEADERS else csv_headers
+
+    @classmethod
+    def from_values(cls, values: Sequence, csv_headers: Optional[Sequence[str]] = None) -> "StockInformation":
+        if len(values) != len(cls.FIELDS):
+            raise ValueError(f"StockInformation needs {len(cls.FIELDS)} values, got {len(values)}")
+        stock_information = cls.__new__(cls)
+        stock_information._values = tuple(values)
+        stock_information._csv_headers = cls.CSV_HEADERS if csv_headers is None else tuple(csv_headers)
+        return stock_information
+
+    @property
+    def values(self) -> Tuple:
+        return self._values
 
     def to_dict(self):
-        result = {}
-        for _, stock_information_entry in self.__dict__.items():
-            result[stock_information_entry.csv_header] = stock_information_entry.value
-        return result
-
-
-def _extract_row_value(
-    soup: BeautifulSoup, row_title: str, minus_years: int, cast_method
-) -> Optional[Union[str, float, int]]:
-    # Find row to process
-    row_to_process = None
-    table_rows = soup.select('table[data-test="financials"] > tbody > tr')
-    for r in table_rows:
-        if row_title.lower() == r.select("td")[0].text.strip().lower():
-            row_to_process = r
-            break
-
-    # Return value of cell
-    cell_to_process = row_to_process.select("td")[1 + minus_years]
-    if "Upgrade" in cell_to_process.text or row_title == cell_to_process.text.strip():
-        return None
-    else:
-        return cast_method(cell_to_process.text.strip())
+        return dict(zip(self._csv_headers, self._values))
+
+    def __eq__(self, other):
+        if not isinstance(other, StockInformation):
+            return NotImplemented
+        return self._values == other._values and self._csv_headers == other._csv_headers
+
+    def __repr__(self):
+        return f"StockInformation({', '.join(f'{field}={value!r}' for field, value in zip(self.FIELDS, self._values))})"
+
+    def __reduce__(self):
+        csv_headers = None if self._csv_headers is self.CSV_HEADERS else self._csv_headers
+        return StockInformation.from_values, (self._values, csv_headers)
+
+
+def _entry_property(index: int) -> property:
+    # Entries are built on access and frozen, so writing to one fails instead of being lost
+    def _get_entry(self: StockInformation) -> StockInformationEntry:
+        return StockInformationEntry(csv_header=self._csv_headers[index], value=self._values[index])
+
+    return property(_get_entry)
+
+
+def _add_entry_properties(cls: type):
+    for index, field in enumerate(cls.FIELDS):
+        setattr(cls, field, _entry_property(index))
+
+
+_add_entry_properties(StockInformation)
+
+
+def _index_table(soup: BeautifulSoup, rows: str) -> Dict[str, List[str]]:
+    # Maps the lowercase row title to the stripped texts of all cells of the row (title included)
+    table = {}
+    for row in soup.select(rows):
+        cells = [cell.text.strip() for cell in row.find_all("td")]
+        table.setdefault(cells[0].lower(), cells)
+    return table
+
+
+@dataclass(frozen=True)
+class CompiledSeriesRule:
+    rule: SeriesRule
+    row_key: str
+    start: int
+    stop: int
+
+
+def compile_plan(series_rules: Sequence[SeriesRule] = SERIES_RULES) -> Tuple[CompiledSeriesRule, ...]:
+    # Everything that does not depend on the page is worked out once instead of once per ticker
+    return tuple(
+        CompiledSeriesRule(
+            rule=rule,
+            row_key=rule.row_title.lower(),
+            start=1 + rule.skip_columns,
+            stop=1 + rule.skip_columns + YEARS,
+        )
+        for rule in series_rules
+    )
+
+
+EXTRACTION_PLAN = compile_plan()
+
+
+def _extract_series(compiled: CompiledSeriesRule, table: Dict[str, List[str]]) -> array:
+    # Returns the cells of the last YEARS years of a row at once, missing years are NaN
+    rule = compiled.rule
+    cells = table[compiled.row_key][compiled.start : compiled.stop]
+    cells = [None if "Upgrade" in cell or rule.row_title == cell else cell for cell in cells]
+    cells += [None] * (YEARS - len(cells))
+    values = rule.bulk_cast_method(cells)
+    if rule.divisor is not None:
+        values = array("d", [round(value / rule.divisor, 2) if value else math.nan for value in values])
+    return values
+
+
+def _extract_table_cell(rule: TableCellRule, soup: BeautifulSoup) -> Optional[float]:
+    for row in soup.select(rule.rows):
+        cells = row.find_all("td")
+        if rule.label.endswith(cells[0].text.strip()):
+            return rule.cast_method(cells[1].text.strip())
+
+
+def _extract_key_stat(rule: KeyStatRule, soup: BeautifulSoup) -> Optional[float]:
+    for div in soup.find_all("div", class_="key-stat"):
+        if rule.label in div.text:
+            return rule.cast_method(div.find("div", class_="key-stat-title").text.strip())
+
+
+VALUE_EXTRACTORS = {TableCellRule: _extract_table_cell, KeyStatRule: _extract_key_stat}
 
 
 class StockInformationGenerator:
 
-    def __init__(self, source_htmls: SourceHtmls):
+    def __init__(
+        self,
+        source_htmls: SourceHtmls,
+        parser: str = AUTO,
+        targeted: bool = True,
+        plan: Tuple[CompiledSeriesRule, ...] = EXTRACTION_PLAN,
+        value_rules: Sequence[Union[TableCellRule, KeyStatRule]] = VALUE_RULES,
+        metrics: Optional[Metrics] = None,
+    ):
         self._ticker: str = source_htmls.ticker
-        self._source_soups: SourceSoups = source_htmls_to_source_soups(source_htmls)
+        self._metrics = metrics
+        self._source_soups: SourceSoups = source_htmls_to_source_soups(
+            source_htmls, parser=resolve_parser(parser), targeted=targeted, metrics=metrics
+        )
+        self._plan = plan
+        self._value_rules = value_rules
+        self._tables: Dict[Tuple[int, int], Dict[str, List[str]]] = {}
+
+    def _get_table(self, soup: BeautifulSoup, rows: str) -> Dict[str, List[str]]:
+        # Each table is indexed once and then reused for all rules that read from it
+        key = (id(soup), id(rows))
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = _index_table(soup, rows)
+        return table
 
     @property
     def company(self) -> str:
@@ -153,288 +318,66 @@ class StockInformationGenerator:
     @property
     def max_year(self) -> int:
         soup = self._source_soups.revenue_soup  # Reads company name from revenue site
-        header_row = soup.select('table[data-test="financials"] > thead > tr')[0]
-        max_year = header_row.select("th")[1].text
+        header_row = soup.select_one(FINANCIALS_HEADER_ROW)
+        max_year = header_row.find_all("th")[1].text
         if max_year:
             return int(max_year)
 
-    def _extract_roic(self, minus_years: int = 0) -> float:
-        soup = self._source_soups.roic_soup
-        minus_years = minus_years + 1  # To skip "Current" column
-        value = _extract_row_value(
-            soup=soup,
-            row_title="Return on Capital (ROIC)",
-            minus_years=minus_years,
-            cast_method=percent_to_float,
-        )
-        return value
-
-    def _extract_book_value(self, minus_years: int = 0) -> float:
-        soup = self._source_soups.book_value_soup
-        value = _extract_row_value(
-            soup=soup,
-            row_title="Book Value per Share",
-            minus_years=minus_years,
-            cast_method=string_to_float,
-        )
-        return value
-
-    def _extract_eps(self, minus_years: int = 0) -> float:
-        soup = self._source_soups.eps_soup
-        value = _extract_row_value(
-            soup=soup,
-            row_title="EPS (Diluted)",
-            minus_years=minus_years,
-            cast_method=string_to_float,
-        )
-        return value
-
-    def _extract_cash_flow(self, minus_years: int = 0) -> float:
-        soup = self._source_soups.cash_flow_soup
-        value = _extract_row_value(
-            soup=soup,
-            row_title="Free Cash Flow Per Share",
-            minus_years=minus_years,
-            cast_method=string_to_float,
-        )
-        return value
+    def extract_series(self, compiled: CompiledSeriesRule) -> array:
+        soup = getattr(self._source_soups, compiled.rule.soup)
+        return _extract_series(compiled, self._get_table(soup, compiled.rule.rows))
 
-    def _extract_revenue(self, minus_years: int = 0) -> float:
-        soup = self._source_soups.revenue_soup
-        revenue_in_millions = _extract_row_value(soup, "Revenue", minus_years=minus_years, cast_method=string_to_float)
-        if revenue_in_millions:
-            return round(revenue_in_millions / 1000.0, 2)
-        else:
-            return None
+    def extract_value(self, rule: Union[TableCellRule, KeyStatRule]) -> Optional[float]:
+        return VALUE_EXTRACTORS[type(rule)](rule, getattr(self._source_soups, rule.soup))
 
-    def _extract_growth_estimates(
-        self,
-        cast_method=string_to_float,
-    ) -> Optional[float]:
-        soup = self._source_soups.growth_estimates_soup
-        table_rows = soup.find("div", id="earnings_growth_estimates").select("table > tbody > tr")
-        for r in table_rows:
-            if "Growth Estimates - Next 5 Years".endswith(r.select("td")[0].text.strip()):
-                text = r.select("td")[1].text.strip()
-                return cast_method(text)
-
-    def _extract_pe_ratio_min(self, cast_method=string_to_float) -> Optional[float]:
-        soup = self._source_soups.pe_min_soup
-        divs = soup.find_all("div", class_="key-stat")
-        for div in divs:
-            if "Minimum" in div.text:
-                minimum = div.find("div", class_="key-stat-title").text.strip()
-                return cast_method(minimum)
-
-    def _extract_pe_ratio_max(self, cast_method=string_to_float) -> Optional[float]:
-        soup = self._source_soups.pe_max_soup
-        divs = soup.find_all("div", class_="key-stat")
-        for div in divs:
-            if "Maximum" in div.text:
-                maximum = div.find("div", class_="key-stat-title").text.strip()
-                return cast_method(maximum)
+    def get_values(self) -> List:
+        with measure_stage(self._metrics, "extract"):
+            values = [self._ticker, self.company, self.max_year]
+            for compiled in self._plan:
+                values.extend(nan_to_none(self.extract_series(compiled)))
+            values += [self.extract_value(rule) for rule in self._value_rules]
+        return values
 
     def get_stock_information(self) -> StockInformation:
-        return StockInformation(
-            ticker=StockInformationEntry(csv_header=HEADERS.ticker, value=self._ticker),
-            company=StockInformationEntry(csv_header=HEADERS.company, value=self.company),
-            max_year=StockInformationEntry(csv_header=HEADERS.max_year, value=self.max_year),
-            # ROIC
-            roic_max_year=StockInformationEntry(csv_header=HEADERS.roic_max_year, value=self._extract_roic()),
-            roic_max_year_minus_1=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_1,
-                value=self._extract_roic(minus_years=1),
-            ),
-            roic_max_year_minus_2=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_2,
-                value=self._extract_roic(minus_years=2),
-            ),
-            roic_max_year_minus_3=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_3,
-                value=self._extract_roic(minus_years=3),
-            ),
-            roic_max_year_minus_4=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_4,
-                value=self._extract_roic(minus_years=4),
-            ),
-            roic_max_year_minus_5=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_5,
-                value=self._extract_roic(minus_years=5),
-            ),
-            roic_max_year_minus_6=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_6,
-                value=self._extract_roic(minus_years=6),
-            ),
-            roic_max_year_minus_7=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_7,
-                value=self._extract_roic(minus_years=7),
-            ),
-            roic_max_year_minus_8=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_8,
-                value=self._extract_roic(minus_years=8),
-            ),
-            roic_max_year_minus_9=StockInformationEntry(
-                csv_header=HEADERS.roic_max_year_minus_9,
-                value=self._extract_roic(minus_years=9),
-            ),
-            # Book Value per Share
-            book_value_max_year=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year, value=self._extract_book_value()
-            ),
-            book_value_max_year_minus_1=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_1,
-                value=self._extract_book_value(minus_years=1),
-            ),
-            book_value_max_year_minus_2=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_2,
-                value=self._extract_book_value(minus_years=2),
-            ),
-            book_value_max_year_minus_3=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_3,
-                value=self._extract_book_value(minus_years=3),
-            ),
-            book_value_max_year_minus_4=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_4,
-                value=self._extract_book_value(minus_years=4),
-            ),
-            book_value_max_year_minus_5=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_5,
-                value=self._extract_book_value(minus_years=5),
-            ),
-            book_value_max_year_minus_6=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_6,
-                value=self._extract_book_value(minus_years=6),
-            ),
-            book_value_max_year_minus_7=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_7,
-                value=self._extract_book_value(minus_years=7),
-            ),
-            book_value_max_year_minus_8=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_8,
-                value=self._extract_book_value(minus_years=8),
-            ),
-            book_value_max_year_minus_9=StockInformationEntry(
-                csv_header=HEADERS.book_value_max_year_minus_9,
-                value=self._extract_book_value(minus_years=9),
-            ),
-            eps_max_year=StockInformationEntry(csv_header=HEADERS.eps_max_year, value=self._extract_eps()),
-            eps_max_year_minus_1=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_1,
-                value=self._extract_eps(minus_years=1),
-            ),
-            eps_max_year_minus_2=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_2,
-                value=self._extract_eps(minus_years=2),
-            ),
-            eps_max_year_minus_3=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_3,
-                value=self._extract_eps(minus_years=3),
-            ),
-            eps_max_year_minus_4=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_4,
-                value=self._extract_eps(minus_years=4),
-            ),
-            eps_max_year_minus_5=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_5,
-                value=self._extract_eps(minus_years=5),
-            ),
-            eps_max_year_minus_6=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_6,
-                value=self._extract_eps(minus_years=6),
-            ),
-            eps_max_year_minus_7=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_7,
-                value=self._extract_eps(minus_years=7),
-            ),
-            eps_max_year_minus_8=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_8,
-                value=self._extract_eps(minus_years=8),
-            ),
-            eps_max_year_minus_9=StockInformationEntry(
-                csv_header=HEADERS.eps_max_year_minus_9,
-                value=self._extract_eps(minus_years=9),
-            ),
-            revenue_max_year=StockInformationEntry(csv_header=HEADERS.revenue_max_year, value=self._extract_revenue()),
-            revenue_max_year_minus_1=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_1,
-                value=self._extract_revenue(minus_years=1),
-            ),
-            revenue_max_year_minus_2=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_2,
-                value=self._extract_revenue(minus_years=2),
-            ),
-            revenue_max_year_minus_3=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_3,
-                value=self._extract_revenue(minus_years=3),
-            ),
-            revenue_max_year_minus_4=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_4,
-                value=self._extract_revenue(minus_years=4),
-            ),
-            revenue_max_year_minus_5=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_5,
-                value=self._extract_revenue(minus_years=5),
-            ),
-            revenue_max_year_minus_6=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_6,
-                value=self._extract_revenue(minus_years=6),
-            ),
-            revenue_max_year_minus_7=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_7,
-                value=self._extract_revenue(minus_years=7),
-            ),
-            revenue_max_year_minus_8=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_8,
-                value=self._extract_revenue(minus_years=8),
-            ),
-            revenue_max_year_minus_9=StockInformationEntry(
-                csv_header=HEADERS.revenue_max_year_minus_9,
-                value=self._extract_revenue(minus_years=9),
-            ),
-            cash_flow_max_year=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year,
-                value=self._extract_cash_flow(),
-            ),
-            cash_flow_max_year_minus_1=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_1,
-                value=self._extract_cash_flow(minus_years=1),
-            ),
-            cash_flow_max_year_minus_2=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_2,
-                value=self._extract_cash_flow(minus_years=2),
-            ),
-            cash_flow_max_year_minus_3=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_3,
-                value=self._extract_cash_flow(minus_years=3),
-            ),
-            cash_flow_max_year_minus_4=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_4,
-                value=self._extract_cash_flow(minus_years=4),
-            ),
-            cash_flow_max_year_minus_5=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_5,
-                value=self._extract_cash_flow(minus_years=5),
-            ),
-            cash_flow_max_year_minus_6=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_6,
-                value=self._extract_cash_flow(minus_years=6),
-            ),
-            cash_flow_max_year_minus_7=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_7,
-                value=self._extract_cash_flow(minus_years=7),
-            ),
-            cash_flow_max_year_minus_8=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_8,
-                value=self._extract_cash_flow(minus_years=8),
-            ),
-            cash_flow_max_year_minus_9=StockInformationEntry(
-                csv_header=HEADERS.free_cash_flow_max_year_minus_9,
-                value=self._extract_cash_flow(minus_years=9),
-            ),
-            growth_estimates=StockInformationEntry(
-                csv_header=HEADERS.growth_estimates,
-                value=self._extract_growth_estimates(),
-            ),
-            pe_min=StockInformationEntry(csv_header=HEADERS.pe_ratio_min, value=self._extract_pe_ratio_min()),
-            pe_max=StockInformationEntry(csv_header=HEADERS.pe_ratio_max, value=self._extract_pe_ratio_max()),
-        )
+        return StockInformation.from_values(self.get_values())
+
+
+class StockInformationMatrix:
+    # Tickers x columns, one row per ticker in StockInformation.FIELDS order
+
+    def __init__(self, rows: List[Tuple], csv_headers: Sequence[str] = StockInformation.CSV_HEADERS):
+        self.rows = rows
+        self.fields = StockInformation.FIELDS
+        self.csv_headers = tuple(csv_headers)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[StockInformation]:
+        # CsvGenerator and ColumnarGenerator read the rows directly, this is for everything else
+        for row in self.rows:
+            yield StockInformation.from_values(row, csv_headers=self.csv_headers)
+
+    def get_column(self, field: str) -> List:
+        index = self.fields.index(field)
+        return [row[index] for row in self.rows]
+
+
+class BatchStockInformationGenerator:
+
+    def __init__(self, parser: str = AUTO, targeted: bool = True, metrics: Optional[Metrics] = None):
+        # Resolved once for the whole batch instead of once per ticker
+        self.parser = resolve_parser(parser)
+        self.targeted = targeted
+        self.metrics = metrics
+
+    def get_stock_information_matrix(self, source_htmls_iterable: Iterable[SourceHtmls]) -> StockInformationMatrix:
+        rows = [
+            tuple(
+                StockInformationGenerator(
+                    source_htmls, parser=self.parser, targeted=self.targeted, metrics=self.metrics
+                ).get_values()
+            )
+            for source_htmls in source_htmls_iterable
+        ]
+        return StockInformationMatrix(rows)
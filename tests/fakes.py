@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from stock_information_scraper.replay_server import find_recorded_page
+
+
+class FakeResponse:
+
+    def __init__(self, status_code: int, text: str = "", headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+
+def _echo_url(url: str) -> FakeResponse:
+    return FakeResponse(200, f"<html>{url}</html>")
+
+
+class FakeSession:
+
+    def __init__(self, handler: Callable[[str], FakeResponse] = _echo_url, delay: float = 0.0):
+        self.handler = handler
+        self.delay = delay
+        self.requests: List[Dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout=None) -> FakeResponse:
+        with self._lock:
+            self.requests.append({"url": url, "headers": headers or {}, "timeout": timeout})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return self.handler(url)
+
+
+def serve_fixtures(url: str) -> FakeResponse:
+    page = find_recorded_page(url)
+    if page is not None:
+        ticker, source = page
+        try:
+            with open(f"tests/data/{ticker.lower()}_{source}.html", "r") as html_file:
+                return FakeResponse(200, html_file.read())
+        except FileNotFoundError:
+            pass
+    return FakeResponse(404)
@@ -0,0 +1,39 @@
+from hamcrest import assert_that, equal_to, greater_than
+
+from benchmarks.run_benchmarks import compare, create_synthetic_tickers, run_benchmarks
+
+
+def test_synthetic_tickers_use_both_fixtures():
+    # When
+    tickers = create_synthetic_tickers(3)
+
+    # Then
+    assert_that(tickers, equal_to(["LLY0000", "META0001", "LLY0002"]))
+
+
+def test_benchmarks_measure_every_stage():
+    # When
+    results = run_benchmarks(ticker_count=2, repeat=1, end_to_end=False)
+
+    # Then
+    assert_that(list(results["stages"]), equal_to(["parse", "extract", "to_dict", "save_csv"]))
+    assert_that(results["stages"]["parse"]["peak_memory_bytes"], greater_than(0))
+    assert_that(len(compare(results, results)), equal_to(4))
+
+
+def test_compare_uses_throughput_of_runs_with_different_sizes():
+    # Given
+    baseline = {
+        "tickers": 100,
+        "stages": {"parse": {"seconds": 10.0, "peak_memory_bytes": 1000, "tickers_per_second": 10.0}},
+    }
+    results = {
+        "tickers": 10,
+        "stages": {"parse": {"seconds": 2.0, "peak_memory_bytes": 100, "tickers_per_second": 5.0}},
+    }
+
+    # When
+    lines = compare(baseline, results)
+
+    # Then
+    assert_that(lines, equal_to(["parse: 0.50x as fast"]))
@@ -0,0 +1,61 @@
+import pytest
+from hamcrest import assert_that, close_to, equal_to
+
+from stock_information_scraper.columnar_generator import ColumnarGenerator, load_npz
+from stock_information_scraper.stock_information import StockInformation, StockInformationMatrix
+
+
+@pytest.fixture
+def stock_information_list():
+    first = [None] * len(StockInformation.FIELDS)
+    first[:4] = ["LLY", "Eli Lilly and Company", 2022, 23.22]
+    second = [float(i) for i in range(len(StockInformation.FIELDS))]
+    second[:3] = ["META", "Meta Platforms, Inc.", None]
+    return [StockInformation.from_values(first), StockInformation.from_values(second)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_columnar_generator_writes_typed_columns(stock_information_list, tmp_path, compress: bool):
+    # Given
+    file_name = str(tmp_path / "numbers.npz")
+
+    # When
+    rows = ColumnarGenerator(stock_information_list).save_npz(file_name, compress=compress)
+
+    # Then
+    columns = load_npz(file_name)
+    assert_that(rows, equal_to(2))
+    assert_that(columns["ticker"], equal_to(["LLY", "META"]))
+    assert_that(columns["company"], equal_to(["Eli Lilly and Company", "Meta Platforms, Inc."]))
+    assert_that(columns["max_year"], equal_to([2022, None]))
+    assert_that(columns["roic_max_year"], equal_to([23.22, 3.0]))
+    assert_that(columns["pe_max"], equal_to([None, 55.0]))
+
+
+def test_columnar_generator_writes_matrix_like_stock_information_list(stock_information_list, tmp_path):
+    # Given
+    matrix = StockInformationMatrix([info.values for info in stock_information_list])
+    ColumnarGenerator(stock_information_list).save_npz(str(tmp_path / "list.npz"))
+
+    # When
+    rows = ColumnarGenerator(matrix).save_npz(str(tmp_path / "matrix.npz"))
+
+    # Then
+    assert_that(rows, equal_to(2))
+    assert_that(load_npz(str(tmp_path / "matrix.npz")), equal_to(load_npz(str(tmp_path / "list.npz"))))
+
+
+def test_columnar_file_loads_with_numpy(stock_information_list, tmp_path):
+    # Given
+    numpy = pytest.importorskip("numpy")
+    file_name = str(tmp_path / "numbers.npz")
+    ColumnarGenerator(stock_information_list).save_npz(file_name)
+
+    # When
+    columns = numpy.load(file_name)
+
+    # Then
+    assert_that(columns["roic_max_year"].dtype, equal_to(numpy.float64))
+    assert_that(columns["roic_max_year"][0], close_to(23.22, 1e-9))
+    assert_that(list(columns["pe_max_mask"]), equal_to([True, False]))
+    assert_that(list(columns["ticker"]), equal_to(["LLY", "META"]))
@@ -6,10 +6,11 @@ from typing import List, Dict
 import pytest
 from hamcrest import assert_that, equal_to
 
-from stock_information_scraper.csv_generator import CsvGenerator
+from stock_information_scraper.csv_generator import CsvGenerator, read_written_tickers
 from stock_information_scraper.stock_information import (
     StockInformation,
     StockInformationEntry,
+    StockInformationMatrix,
 )
 
 
@@ -172,3 +173,68 @@ def test_csv_generator_works(csv_headers: List[str], stock_information_list: Lis
     assert_that(dict_1["Col 45"], equal_to("1.45"))
     assert_that(dict_2["Col 55"], equal_to("2.55"))
     assert_that(len(dict_1), equal_to(len(dict_2)))
+
+
+def test_csv_generator_appends_to_existing_file(
+    csv_headers: List[str], stock_information_list: List[StockInformation], temp_file
+):
+    # Given
+    CsvGenerator(stock_information_list=stock_information_list[:1]).save_csv(
+        file_name=temp_file, csv_headers=csv_headers
+    )
+    with open(temp_file, "a") as csv_file:
+        csv_file.write("ticker_2,My Fake Com")  # Row of a run that was killed while writing
+
+    # When
+    CsvGenerator(stock_information_list=stock_information_list[1:]).append_csv(
+        file_name=temp_file, csv_headers=csv_headers
+    )
+
+    # Then
+    dicts = read_csv_as_dict(temp_file)
+    assert_that([row["Col 1"] for row in dicts], equal_to(["ticker_1", "ticker_2"]))
+    assert_that(dicts[1]["Col 2"], equal_to("My Fake Company 2"))
+    assert_that(read_written_tickers(temp_file, ticker_header="Col 1"), equal_to({"ticker_1", "ticker_2"}))
+
+
+def test_csv_generator_appends_header_to_new_file(
+    csv_headers: List[str], stock_information_list: List[StockInformation], temp_file
+):
+    # When
+    CsvGenerator(stock_information_list=stock_information_list).append_csv(file_name=temp_file, csv_headers=csv_headers)
+
+    # Then
+    assert_that(len(read_csv_as_dict(temp_file)), equal_to(2))
+
+
+def test_read_written_tickers_ignores_half_written_last_row_without_changing_the_file(temp_file):
+    # Given
+    with open(temp_file, "w") as csv_file:
+        csv_file.write("Ticker,Company\nAAA,A Inc.\nLLY,Eli Li")  # Run killed while writing the LLY row
+
+    # When
+    written_tickers = read_written_tickers(temp_file)
+
+    # Then
+    assert_that(written_tickers, equal_to({"AAA"}))
+    with open(temp_file, "r") as csv_file:
+        assert_that(csv_file.read(), equal_to("Ticker,Company\nAAA,A Inc.\nLLY,Eli Li"))
+
+
+def test_csv_generator_writes_matrix_like_stock_information_list(
+    csv_headers: List[str], stock_information_list: List[StockInformation], tmp_path
+):
+    # Given
+    matrix = StockInformationMatrix([info.values for info in stock_information_list], csv_headers=csv_headers)
+    CsvGenerator(stock_information_list=stock_information_list).save_csv(
+        file_name=str(tmp_path / "list.csv"), csv_headers=csv_headers
+    )
+
+    # When
+    rows = CsvGenerator(stock_information_list=matrix).save_csv(
+        file_name=str(tmp_path / "matrix.csv"), csv_headers=csv_headers
+    )
+
+    # Then
+    assert_that(rows, equal_to(2))
+    assert_that(read_csv_as_dict(str(tmp_path / "matrix.csv")), equal_to(read_csv_as_dict(str(tmp_path / "list.csv"))))
@@ -0,0 +1,109 @@
+import os
+from datetime import date
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from stock_information_scraper.html_archive import ZLIB, HtmlArchive
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher, SourceHtmls
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.pipeline import parse_stage
+from tests.fakes import FakeSession, serve_fixtures
+
+MONDAY = date(2024, 3, 4)
+TUESDAY = date(2024, 3, 5)
+
+
+@pytest.fixture
+def source_htmls_list() -> list:
+    client = HttpClient(session=FakeSession(handler=serve_fixtures))
+    return ConcurrentHtmlFetcher(tickers=["LLY", "META"], client=client).get_source_htmls_list()
+
+
+def test_archive_returns_pages_by_ticker_source_and_date(tmp_path, source_htmls_list):
+    # Given
+    lly, meta = source_htmls_list
+    with HtmlArchive(archive_dir=str(tmp_path), codec=ZLIB) as archive:
+        archive.put_source_htmls(lly, fetched_on=MONDAY)
+        archive.put("LLY", "roic", "<html>restated</html>", fetched_on=TUESDAY)
+
+    # When
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        monday = archive.get_source_htmls("LLY", MONDAY)
+        tuesday_roic = archive.get("LLY", "roic", TUESDAY)
+        missing = archive.get_source_htmls("META", MONDAY)
+        dates = archive.get_dates("LLY")
+
+    # Then
+    assert_that(monday, equal_to(lly))
+    assert_that(tuesday_roic, equal_to("<html>restated</html>"))
+    assert_that(missing, equal_to(None))
+    assert_that(dates, equal_to([MONDAY, TUESDAY]))
+
+
+def test_archive_stores_identical_pages_once(tmp_path, source_htmls_list):
+    # Given
+    lly = source_htmls_list[0]
+    archive = HtmlArchive(archive_dir=str(tmp_path), codec=ZLIB)
+    archive.put_source_htmls(lly, fetched_on=MONDAY)
+    size_after_monday = os.path.getsize(tmp_path / "pages-00000.pack")
+
+    # When
+    archive.put_source_htmls(lly, fetched_on=TUESDAY)
+
+    # Then
+    assert_that(os.path.getsize(tmp_path / "pages-00000.pack"), equal_to(size_after_monday))
+    assert_that(archive.get_source_htmls("LLY", TUESDAY), equal_to(lly))
+    archive.close()
+
+
+def test_archive_starts_new_packs_and_skips_incomplete_index_lines(tmp_path, source_htmls_list):
+    # Given
+    archive = HtmlArchive(archive_dir=str(tmp_path), codec=ZLIB, max_pack_size=1)
+    for source_htmls in source_htmls_list:
+        archive.put_source_htmls(source_htmls, fetched_on=MONDAY)
+    archive.close()
+    with open(tmp_path / "index.jsonl", "a") as index_file:
+        index_file.write('{"ticker": "MS')
+
+    # When
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        source_htmls_list_again = list(archive.iter_source_htmls(["LLY", "MSFT", "META"], fetched_on=MONDAY))
+        stock_information = list(parse_stage(source_htmls_list_again))
+
+    # Then
+    assert_that(source_htmls_list_again, equal_to(source_htmls_list))
+    assert_that(len([name for name in os.listdir(tmp_path) if name.endswith(".pack")]), equal_to(12))
+    assert_that(stock_information, equal_to(list(parse_stage(source_htmls_list))))
+
+
+def test_archived_pages_keep_their_text(tmp_path):
+    # Given
+    source_htmls = SourceHtmls("ÄBC", *["<html>Ümlaut €</html>"] * 8)
+
+    # When
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        archive.put_source_htmls(source_htmls, fetched_on=MONDAY)
+        result = archive.get_source_htmls("ÄBC", MONDAY)
+
+    # Then
+    assert_that(result, equal_to(source_htmls))
+
+
+def test_archive_keeps_pages_put_after_an_incomplete_index_line(tmp_path):
+    # Given
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        archive.put("LLY", "roic", "<html>LLY</html>", fetched_on=MONDAY)
+    with open(tmp_path / "index.jsonl", "a") as index_file:
+        index_file.write('{"ticker": "MS')  # Run killed while writing the MSFT record
+
+    # When
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        archive.put("META", "roic", "<html>META</html>", fetched_on=MONDAY)
+    with HtmlArchive(archive_dir=str(tmp_path)) as archive:
+        lly_roic = archive.get("LLY", "roic", MONDAY)
+        meta_roic = archive.get("META", "roic", MONDAY)
+
+    # Then
+    assert_that(lly_roic, equal_to("<html>LLY</html>"))
+    assert_that(meta_roic, equal_to("<html>META</html>"))
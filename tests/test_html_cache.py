@@ -0,0 +1,100 @@
+import os
+import time
+
+import pytest
+from hamcrest import assert_that, equal_to, none
+
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.http_client import HttpClient
+from tests.fakes import FakeResponse, FakeSession
+
+URL = "https://stockanalysis.com/stocks/LLY/financials/"
+
+
+@pytest.fixture
+def cache(tmp_path) -> HtmlCache:
+    return HtmlCache(cache_dir=str(tmp_path))
+
+
+def test_cache_returns_stored_page(cache: HtmlCache):
+    # Given
+    cache.put(URL, "<html>LLY</html>", etag='"abc"')
+
+    # When
+    entry = cache.get(URL)
+
+    # Then
+    assert_that(entry.html, equal_to("<html>LLY</html>"))
+    assert_that(entry.get_validators(), equal_to({"If-None-Match": '"abc"'}))
+    assert_that(cache.is_fresh(entry), equal_to(True))
+    assert_that(cache.get("https://stockanalysis.com/stocks/META/financials/"), none())
+
+
+def test_cache_uses_max_age_per_host(tmp_path):
+    # Given
+    cache = HtmlCache(cache_dir=str(tmp_path), max_ages={"stockanalysis.com": 60})
+    entry = cache.put(URL, "<html>LLY</html>")
+    entry.fetched_at = time.time() - 120
+
+    # Then
+    assert_that(cache.is_fresh(entry), equal_to(False))
+    assert_that(HtmlCache(cache_dir=str(tmp_path), max_age=600).is_fresh(entry), equal_to(True))
+
+
+def test_cache_evicts_least_recently_used_pages(tmp_path):
+    # Given
+    cache = HtmlCache(cache_dir=str(tmp_path), max_size=2500)
+    for ticker in ["LLY", "META", "MSFT"]:
+        cache.put(f"https://stockanalysis.com/stocks/{ticker}/", "x" * 1000)
+        time.sleep(0.01)
+
+    # Then
+    assert_that(cache.get("https://stockanalysis.com/stocks/LLY/"), none())
+    assert_that(cache.get("https://stockanalysis.com/stocks/MSFT/").html, equal_to("x" * 1000))
+
+
+def test_fetch_html_skips_network_for_fresh_pages(cache: HtmlCache):
+    # Given
+    session = FakeSession(handler=lambda url: FakeResponse(200, "<html>LLY</html>", {"ETag": '"abc"'}))
+    client = HttpClient(session=session, cache=cache)
+
+    # When
+    first = client.fetch_html(URL)
+    second = client.fetch_html(URL)
+
+    # Then
+    assert_that(first, equal_to("<html>LLY</html>"))
+    assert_that(second, equal_to("<html>LLY</html>"))
+    assert_that(len(session.requests), equal_to(1))
+
+
+def test_fetch_html_revalidates_stale_pages(tmp_path):
+    # Given
+    cache = HtmlCache(cache_dir=str(tmp_path), max_age=0)
+    cache.put(URL, "<html>LLY</html>", etag='"abc"')
+    session = FakeSession(handler=lambda url: FakeResponse(304))
+
+    # When
+    html = HttpClient(session=session, cache=cache).fetch_html(URL)
+
+    # Then
+    assert_that(html, equal_to("<html>LLY</html>"))
+    assert_that(session.requests[0]["headers"]["If-None-Match"], equal_to('"abc"'))
+
+
+def test_cache_returns_page_evicted_while_it_was_read(cache: HtmlCache, monkeypatch):
+    # Given
+    cache.put(URL, "<html>LLY</html>")
+    os_utime = os.utime
+
+    def evict_then_utime(path, *args, **kwargs):
+        os.remove(path)
+        return os_utime(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "utime", evict_then_utime)
+
+    # When
+    entry = cache.get(URL)
+
+    # Then
+    assert_that(entry.html, equal_to("<html>LLY</html>"))
@@ -0,0 +1,71 @@
+import pytest
+from hamcrest import assert_that, equal_to, greater_than
+
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher, HtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from tests.fakes import FakeSession
+
+
+@pytest.fixture
+def session() -> FakeSession:
+    return FakeSession(delay=0.01)
+
+
+def test_concurrent_fetcher_returns_same_source_htmls(session: FakeSession):
+    # Given
+    tickers = ["LLY", "META", "MSFT"]
+
+    # When
+    client = HttpClient(session=session)
+    expected = [HtmlFetcher(ticker=ticker, client=client).get_source_htmls() for ticker in tickers]
+    result = ConcurrentHtmlFetcher(tickers=tickers, max_workers=4, client=client).get_source_htmls_list()
+
+    # Then
+    assert_that(result, equal_to(expected))
+    assert_that(result[1].roic_html, equal_to("<html>https://stockanalysis.com/stocks/META/financials/ratios/</html>"))
+
+
+def test_concurrent_fetcher_respects_max_workers(session: FakeSession):
+    # Given
+    client = HttpClient(session=session)
+
+    # When
+    ConcurrentHtmlFetcher(tickers=["LLY", "META", "MSFT", "AAPL"], max_workers=3, client=client).get_source_htmls_list()
+
+    # Then
+    assert_that(session.max_in_flight, greater_than(1))
+    assert_that(session.max_in_flight <= 3, equal_to(True))
+
+
+def test_html_fetcher_fetches_each_distinct_url_once(session: FakeSession):
+    # When
+    source_htmls = HtmlFetcher(ticker="LLY", client=HttpClient(session=session)).get_source_htmls()
+
+    # Then
+    assert_that(len(session.requests), equal_to(6))
+    assert_that(source_htmls.eps_html, equal_to(source_htmls.revenue_html))
+    assert_that(source_htmls.pe_min_html, equal_to(source_htmls.pe_max_html))
+
+
+def test_concurrent_fetcher_merges_requests_in_flight(session: FakeSession):
+    # Given
+    client = HttpClient(session=session)
+
+    # When
+    result = ConcurrentHtmlFetcher(tickers=["LLY", "LLY"], max_workers=8, client=client).get_source_htmls_list()
+
+    # Then
+    assert_that(len(session.requests), equal_to(6))
+    assert_that(result[0], equal_to(result[1]))
+
+
+def test_http_client_sends_timeouts(session: FakeSession):
+    # Given
+    client = HttpClient(session=session, timeout=(1.0, 2.0))
+
+    # When
+    html = client.fetch_html("https://ycharts.com/companies/LLY/pe_ratio")
+
+    # Then
+    assert_that(html, equal_to("<html>https://ycharts.com/companies/LLY/pe_ratio</html>"))
+    assert_that(session.requests[0]["timeout"], equal_to((1.0, 2.0)))
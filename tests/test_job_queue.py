@@ -0,0 +1,154 @@
+import csv
+
+from hamcrest import assert_that, equal_to
+
+from stock_information_scraper import CsvHeader
+from stock_information_scraper.csv_generator import merge_csv_files
+from stock_information_scraper.distributed import run_worker
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.job_queue import JobQueue
+from stock_information_scraper.retry_policy import RetryPolicy
+from tests.fakes import FakeResponse, FakeSession, serve_fixtures
+from tests.test_csv_generator import read_csv_as_dict
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_queue_leases_each_ticker_to_one_worker(tmp_path):
+    # Given
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.add(["LLY", "META", "MSFT"])
+
+    # When
+    first = queue.lease("worker-1", count=2)
+    second = queue.lease("worker-2", count=2)
+    third = queue.lease("worker-3", count=2)
+
+    # Then
+    assert_that(first, equal_to(["LLY", "META"]))
+    assert_that(second, equal_to(["MSFT"]))
+    assert_that(third, equal_to([]))
+
+
+def test_queue_gives_expired_leases_to_another_worker(tmp_path):
+    # Given
+    clock = FakeClock()
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=60, clock=clock)
+    queue.add(["LLY", "META"])
+    queue.lease("worker-1", count=1)
+    queue.lease("worker-2", count=1)
+
+    # When
+    clock.now += 45
+    queue.heartbeat("worker-2")
+    clock.now += 45
+    leased = queue.lease("worker-3", count=2)
+
+    # Then
+    assert_that(leased, equal_to(["LLY"]))
+    assert_that(queue.complete("worker-1", "LLY"), equal_to(False))
+    assert_that(queue.complete("worker-3", "LLY"), equal_to(True))
+    assert_that(queue.get_counts(), equal_to({"pending": 0, "leased": 1, "done": 1, "failed": 0}))
+
+
+def test_queue_gives_up_after_max_attempts(tmp_path):
+    # Given
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.add(["LLY"])
+
+    # When
+    for _ in range(2):
+        queue.lease("worker-1")
+        queue.fail("worker-1", "LLY", "status 404", max_attempts=2)
+
+    # Then
+    assert_that(queue.get_tickers("failed"), equal_to(["LLY"]))
+
+
+def test_workers_and_merge_give_one_csv_in_queue_order(tmp_path):
+    # Given
+    clock = FakeClock()
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=60, clock=clock)
+    queue.add(["META", "LLY", "UNKNOWN"])
+    client = HttpClient(session=FakeSession(handler=serve_fixtures))
+    worker_file = str(tmp_path / "numbers_worker.csv")
+    queue.lease("dead-worker", count=1)
+
+    # When
+    rows_before_lease_ran_out = run_worker(queue, worker_file, client=client, worker="worker", max_attempts=2)
+    clock.now += 61
+    rows_after_lease_ran_out = run_worker(queue, worker_file, client=client, worker="worker", max_attempts=2)
+    merged = merge_csv_files(
+        [worker_file, worker_file], str(tmp_path / "numbers.csv"), ticker_order=queue.get_tickers()
+    )
+
+    # Then
+    rows = read_csv_as_dict(str(tmp_path / "numbers.csv"))
+    assert_that(rows_before_lease_ran_out, equal_to(1))
+    assert_that(rows_after_lease_ran_out, equal_to(1))
+    assert_that(merged, equal_to(2))
+    assert_that([row["Ticker"] for row in rows], equal_to(["META", "LLY"]))
+    with open(tmp_path / "numbers.csv", "r") as numbers_csv:
+        assert_that(next(csv.reader(numbers_csv)), equal_to(CsvHeader().to_list()))
+    assert_that(queue.get_counts(), equal_to({"pending": 0, "leased": 0, "done": 2, "failed": 1}))
+
+
+def test_queue_fails_tickers_whose_leases_keep_running_out(tmp_path):
+    # Given
+    clock = FakeClock()
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=60, clock=clock)
+    queue.add(["LLY", "META"])
+
+    # When
+    leases = []
+    for _ in range(3):
+        leases.append(queue.lease("worker", count=1, max_attempts=2))
+        clock.now += 61
+
+    # Then
+    assert_that(leases, equal_to([["LLY"], ["LLY"], ["META"]]))
+    assert_that(queue.get_tickers("failed"), equal_to(["LLY"]))
+
+
+def test_worker_fails_tickers_whose_pages_cannot_be_parsed(tmp_path):
+    # Given
+    def serve_fixtures_and_broken_page(url: str) -> FakeResponse:
+        if "/BROKEN/" in url:
+            return FakeResponse(200, "<html><body>Maintenance</body></html>")
+        return serve_fixtures(url)
+
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.add(["META", "BROKEN", "LLY"])
+    client = HttpClient(session=FakeSession(handler=serve_fixtures_and_broken_page))
+    worker_file = str(tmp_path / "numbers_worker.csv")
+
+    # When
+    rows = run_worker(queue, worker_file, client=client, worker="worker", max_attempts=1)
+
+    # Then
+    assert_that(rows, equal_to(2))
+    assert_that([row["Ticker"] for row in read_csv_as_dict(worker_file)], equal_to(["META", "LLY"]))
+    assert_that(queue.get_counts(), equal_to({"pending": 0, "leased": 0, "done": 2, "failed": 1}))
+
+
+def test_worker_fails_tickers_with_status_that_is_not_retried_at_once(tmp_path):
+    # Given
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.add(["DELISTED"])
+    session = FakeSession(handler=serve_fixtures)
+    client = HttpClient(session=session, retry_policy=RetryPolicy(sleep=lambda _: None))
+
+    # When
+    rows = run_worker(queue, str(tmp_path / "numbers_worker.csv"), client=client, worker="worker", max_attempts=3)
+
+    # Then
+    assert_that(rows, equal_to(0))
+    assert_that(queue.get_tickers("failed"), equal_to(["DELISTED"]))
+    assert_that(len({request["url"] for request in session.requests}), equal_to(len(session.requests)))
@@ -0,0 +1,99 @@
+import gzip
+import io
+
+import requests
+from hamcrest import assert_that, contains_string, equal_to, greater_than
+from urllib3 import HTTPResponse
+
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.html_fetcher import HtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.metrics import Histogram, Metrics
+from stock_information_scraper.pipeline import parse_stage
+from stock_information_scraper.replay_server import Faults, ReplayServer
+from stock_information_scraper.retry_policy import RetryPolicy
+from tests.fakes import FakeSession
+
+
+def test_histogram_counts_values_per_bucket():
+    # Given
+    histogram = Histogram(buckets=(0.1, 1.0, float("inf")))
+
+    # When
+    for value in [0.05, 0.5, 0.7, 3.0]:
+        histogram.observe(value)
+
+    # Then
+    assert_that(histogram.counts, equal_to([1, 2, 1]))
+    assert_that(histogram.get_cumulative_counts(), equal_to([1, 3, 4]))
+    assert_that(histogram.count, equal_to(4))
+
+
+def test_metrics_record_requests_retries_and_cache(tmp_path):
+    # Given
+    metrics = Metrics()
+    client = HttpClient(
+        cache=HtmlCache(cache_dir=str(tmp_path)),
+        retry_policy=RetryPolicy(sleep=lambda _: None),
+        metrics=metrics,
+    )
+
+    with ReplayServer(faults=Faults(fail_first=1, error_status_codes=(429,))) as replay_server:
+        fetcher = HtmlFetcher(ticker="LLY", client=client, base_urls=replay_server.base_urls)
+
+        # When
+        source_htmls = fetcher.get_source_htmls()
+        fetcher.get_source_htmls()
+    list(parse_stage([source_htmls], metrics=metrics))
+
+    # Then
+    report = metrics.to_dict()
+    host = report["hosts"]["127.0.0.1"]
+    assert_that(host["status_codes"], equal_to({"429": 6, "200": 6}))
+    assert_that(host["retries"], equal_to(6))
+    assert_that(host["latency_seconds"]["count"], equal_to(12))
+    assert_that(host["bytes"], greater_than(0))
+    assert_that(report["cache"], equal_to({"hit": 6, "revalidated": 0, "miss": 6, "hit_ratio": 0.5}))
+    assert_that(sorted(report["stages"]), equal_to(["extract", "fetch", "parse"]))
+    assert_that(report["stages"]["parse"]["calls"], equal_to(1))
+
+
+def test_metrics_can_be_written_for_prometheus():
+    # Given
+    metrics = Metrics()
+    metrics.observe_request("ycharts.com", 0.3, 200, size=100)
+    metrics.count_retry("ycharts.com")
+
+    # When
+    text = metrics.to_prometheus()
+
+    # Then
+    assert_that(text, contains_string('scraper_request_duration_seconds_bucket{host="ycharts.com",le="0.25"} 0'))
+    assert_that(text, contains_string('scraper_request_duration_seconds_bucket{host="ycharts.com",le="+Inf"} 1'))
+    assert_that(text, contains_string('scraper_responses_total{host="ycharts.com",status="200"} 1'))
+    assert_that(text, contains_string('scraper_retries_total{host="ycharts.com"} 1'))
+
+
+def test_metrics_count_compressed_bytes():
+    # Given
+    html = "<html>" + "LLY " * 1000 + "</html>"
+    body = gzip.compress(html.encode("utf-8"))
+
+    def serve_gzip(url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Encoding"] = "gzip"
+        response.raw = HTTPResponse(
+            body=io.BytesIO(body), headers={"Content-Encoding": "gzip"}, status=200, preload_content=False
+        )
+        return response
+
+    metrics = Metrics()
+    client = HttpClient(session=FakeSession(handler=serve_gzip), metrics=metrics)
+
+    # When
+    fetched_html = client.fetch_html("https://stockanalysis.com/stocks/LLY/financials/")
+
+    # Then
+    assert_that(fetched_html, equal_to(html))
+    assert_that(metrics.to_dict()["hosts"]["stockanalysis.com"]["bytes"], equal_to(len(body)))
@@ -0,0 +1,19 @@
+from hamcrest import assert_that, calling, equal_to, raises
+
+from stock_information_scraper import parser_backend
+from stock_information_scraper.parser_backend import resolve_parser
+
+
+def test_auto_prefers_lxml(monkeypatch):
+    monkeypatch.setattr(parser_backend, "is_available", lambda parser: True)
+    assert_that(resolve_parser("auto"), equal_to("lxml"))
+
+
+def test_falls_back_to_html_parser(monkeypatch):
+    monkeypatch.setattr(parser_backend, "is_available", lambda parser: parser == "html.parser")
+    assert_that(resolve_parser("auto"), equal_to("html.parser"))
+    assert_that(resolve_parser("lxml"), equal_to("html.parser"))
+
+
+def test_rejects_unknown_parsers():
+    assert_that(calling(resolve_parser).with_args("selectolax"), raises(ValueError))
@@ -0,0 +1,54 @@
+from hamcrest import assert_that, equal_to, less_than_or_equal_to
+
+from stock_information_scraper.csv_generator import CsvGenerator
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.pipeline import parallel_parse_stage, parse_stage
+from tests.fakes import FakeSession, serve_fixtures
+from tests.test_csv_generator import read_csv_as_dict
+
+
+def test_pipeline_streams_tickers_to_csv(tmp_path):
+    # Given
+    client = HttpClient(session=FakeSession(handler=serve_fixtures))
+    fetcher = ConcurrentHtmlFetcher(tickers=["LLY", "META"], max_workers=4, client=client)
+    file_name = str(tmp_path / "numbers.csv")
+
+    # When
+    rows_written = CsvGenerator(parse_stage(fetcher.iter_source_htmls())).save_csv(file_name=file_name)
+
+    # Then
+    rows = read_csv_as_dict(file_name)
+    assert_that(rows_written, equal_to(2))
+    assert_that(rows[0]["Ticker"], equal_to("LLY"))
+    assert_that(rows[0]["Revenue (Max Year)"], equal_to("28.54"))
+    assert_that(rows[1]["Company"], equal_to("Meta Platforms, Inc."))
+
+
+def test_fetcher_only_fetches_a_few_tickers_ahead():
+    # Given
+    session = FakeSession()
+    client = HttpClient(session=session)
+    tickers = [f"T{i}" for i in range(100)]
+    fetcher = ConcurrentHtmlFetcher(tickers=tickers, max_workers=2, client=client, max_pending_tickers=3)
+
+    # When
+    source_htmls = fetcher.iter_source_htmls()
+    next(source_htmls)
+
+    # Then
+    assert_that(len(session.requests), less_than_or_equal_to(4 * 6))
+    source_htmls.close()
+
+
+def test_parallel_parse_stage_gives_same_results_in_order():
+    # Given
+    client = HttpClient(session=FakeSession(handler=serve_fixtures))
+    source_htmls_list = ConcurrentHtmlFetcher(tickers=["LLY", "META", "LLY"], client=client).get_source_htmls_list()
+
+    # When
+    result = list(parallel_parse_stage(source_htmls_list, processes=2, max_pending=2))
+
+    # Then
+    assert_that(result, equal_to(list(parse_stage(source_htmls_list))))
+    assert_that([info.ticker.value for info in result], equal_to(["LLY", "META", "LLY"]))
@@ -0,0 +1,73 @@
+import argparse
+from typing import List
+
+from hamcrest import assert_that, calling, equal_to, raises
+
+from stock_information_scraper.rate_limiter import HostRateLimiter, RateLimit, TokenBucket, parse_rate_limit
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    # Given
+    clock = FakeClock()
+    bucket = TokenBucket(RateLimit(requests_per_second=2.0, burst=2), clock=clock, sleep=clock.sleep)
+
+    # When
+    for _ in range(4):
+        bucket.acquire()
+
+    # Then
+    assert_that(clock.sleeps, equal_to([0.5, 1.0]))
+
+
+def test_token_bucket_refills_over_time():
+    # Given
+    clock = FakeClock()
+    bucket = TokenBucket(RateLimit(requests_per_second=1.0, burst=1), clock=clock, sleep=clock.sleep)
+
+    # When
+    bucket.acquire()
+    clock.now = 5.0
+    bucket.acquire()
+
+    # Then
+    assert_that(clock.sleeps, equal_to([]))
+
+
+def test_host_rate_limiter_only_limits_configured_hosts():
+    # Given
+    limiter = HostRateLimiter(rate_limits={"ycharts.com": RateLimit(requests_per_second=1.0)})
+
+    # When
+    limiter.acquire("https://stockanalysis.com/stocks/LLY/financials/")
+    limiter.acquire("https://ycharts.com/companies/LLY/pe_ratio")
+
+    # Then
+    assert_that(list(limiter._buckets), equal_to(["ycharts.com"]))
+
+
+def test_parse_rate_limit():
+    assert_that(parse_rate_limit("ycharts.com=0.5:2"), equal_to(("ycharts.com", RateLimit(0.5, burst=2))))
+    assert_that(parse_rate_limit("www.zacks.com=3"), equal_to(("www.zacks.com", RateLimit(3.0, burst=1))))
+    assert_that(calling(parse_rate_limit).with_args("ycharts.com"), raises(argparse.ArgumentTypeError))
+
+
+def test_rate_limit_must_allow_requests():
+    assert_that(
+        calling(parse_rate_limit).with_args("ycharts.com=0"), raises(argparse.ArgumentTypeError, "greater than 0")
+    )
+    assert_that(calling(parse_rate_limit).with_args("ycharts.com=-1"), raises(argparse.ArgumentTypeError))
+    assert_that(calling(parse_rate_limit).with_args("ycharts.com=1:0"), raises(argparse.ArgumentTypeError, "Burst"))
+    assert_that(calling(RateLimit).with_args(requests_per_second=0.0), raises(ValueError))
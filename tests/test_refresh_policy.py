@@ -0,0 +1,73 @@
+from hamcrest import assert_that, equal_to
+
+from stock_information_scraper.csv_generator import CsvGenerator, read_max_years
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.pipeline import parse_stage
+from stock_information_scraper.refresh_policy import (
+    CURRENT_FINANCIALS_MAX_AGE,
+    DAY,
+    DUE_FINANCIALS_MAX_AGE,
+    RefreshPolicy,
+)
+from stock_information_scraper.replay_server import ReplayServer
+
+
+def test_refresh_policy_checks_financials_only_when_a_new_year_is_due():
+    # Given
+    policy = RefreshPolicy(previous_max_years={"LLY": 2022, "META": 2020}, current_year=2023)
+
+    # When
+    lly_max_age = policy.get_max_age("LLY", ["eps_html", "revenue_html"])
+    meta_max_age = policy.get_max_age("META", ["eps_html", "revenue_html"])
+
+    # Then
+    assert_that(lly_max_age, equal_to(CURRENT_FINANCIALS_MAX_AGE))
+    assert_that(meta_max_age, equal_to(DUE_FINANCIALS_MAX_AGE))
+    assert_that(policy.get_max_age("LLY", ["pe_min_html", "pe_max_html"]), equal_to(7 * DAY))
+    assert_that(policy.get_max_age("MSFT", ["eps_html"]), equal_to(None))
+
+
+def test_incremental_refresh_only_fetches_pages_that_may_have_changed(tmp_path):
+    # Given
+    cache = HtmlCache(cache_dir=str(tmp_path / "cache"), max_age=0)
+    file_name = str(tmp_path / "numbers.csv")
+    with ReplayServer() as replay_server:
+        fetcher = ConcurrentHtmlFetcher(
+            tickers=["LLY", "META"], client=HttpClient(cache=cache), base_urls=replay_server.base_urls
+        )
+        CsvGenerator(parse_stage(fetcher.iter_source_htmls())).save_csv(file_name=file_name)
+        first_run_requests = list(replay_server.stats.requests)
+
+        # Two days later, LLY's fiscal year 2022 is still the newest one but META's is overdue
+        for path in first_run_requests:
+            entry = cache.get(replay_server.root_url + path)
+            entry.fetched_at -= 2 * DAY
+            cache._write(entry)
+        policy = RefreshPolicy(previous_max_years={**read_max_years(file_name), "META": 2021}, current_year=2023)
+
+        # When
+        fetcher = ConcurrentHtmlFetcher(
+            tickers=["LLY", "META"],
+            client=HttpClient(cache=cache),
+            base_urls=replay_server.base_urls,
+            refresh_policy=policy,
+        )
+        source_htmls_list = fetcher.get_source_htmls_list()
+
+    # Then
+    assert_that(read_max_years(file_name), equal_to({"LLY": 2022, "META": 2023}))
+    assert_that([source_htmls.ticker for source_htmls in source_htmls_list], equal_to(["LLY", "META"]))
+    assert_that(
+        sorted(replay_server.stats.requests[len(first_run_requests) :]),
+        equal_to(
+            [
+                "/stocks/META/financials/",
+                "/stocks/META/financials/balance-sheet/",
+                "/stocks/META/financials/cash-flow-statement/",
+                "/stocks/META/financials/ratios/",
+            ]
+        ),
+    )
+    assert_that(replay_server.stats.status_codes, equal_to({200: 12, 304: 4}))
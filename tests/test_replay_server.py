@@ -0,0 +1,74 @@
+from hamcrest import assert_that, equal_to
+
+from stock_information_scraper.html_cache import HtmlCache
+from stock_information_scraper.html_fetcher import HtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.replay_server import Faults, ReplayServer, record_source_htmls
+from stock_information_scraper.retry_policy import RetryPolicy
+
+
+def _read_fixture(ticker: str, source: str) -> str:
+    with open(f"tests/data/{ticker}_{source}.html", "r") as html_file:
+        return html_file.read()
+
+
+def test_replay_server_serves_fixtures():
+    # Given
+    with ReplayServer() as replay_server:
+        fetcher = HtmlFetcher(ticker="META", base_urls=replay_server.base_urls)
+
+        # When
+        source_htmls = fetcher.get_source_htmls()
+
+    # Then
+    assert_that(source_htmls.roic_html, equal_to(_read_fixture("meta", "roic")))
+    assert_that(source_htmls.pe_max_html, equal_to(_read_fixture("meta", "pe_ratio_min")))
+    assert_that(len(replay_server.stats.requests), equal_to(6))
+
+
+def test_replay_server_injects_errors_that_are_retried():
+    # Given
+    delays = []
+    client = HttpClient(retry_policy=RetryPolicy(sleep=delays.append))
+
+    with ReplayServer(faults=Faults(fail_first=2, error_status_codes=(503,), retry_after=1)) as replay_server:
+        fetcher = HtmlFetcher(ticker="LLY", client=client, base_urls=replay_server.base_urls)
+
+        # When
+        source_htmls = fetcher.get_source_htmls()
+
+    # Then
+    assert_that(source_htmls.eps_html, equal_to(_read_fixture("lly", "eps")))
+    assert_that(replay_server.stats.status_codes, equal_to({503: 12, 200: 6}))
+    assert_that(delays, equal_to([1.0] * 12))
+
+
+def test_replay_server_revalidates_cached_pages(tmp_path):
+    # Given
+    client = HttpClient(cache=HtmlCache(cache_dir=str(tmp_path), max_age=0))
+
+    with ReplayServer() as replay_server:
+        fetcher = HtmlFetcher(ticker="LLY", client=client, base_urls=replay_server.base_urls)
+
+        # When
+        first = fetcher.get_source_htmls()
+        second = fetcher.get_source_htmls()
+
+    # Then
+    assert_that(second, equal_to(first))
+    assert_that(replay_server.stats.status_codes, equal_to({200: 6, 304: 6}))
+
+
+def test_recorded_pages_are_replayed(tmp_path):
+    # Given
+    with ReplayServer() as replay_server:
+        source_htmls = HtmlFetcher(ticker="LLY", base_urls=replay_server.base_urls).get_source_htmls()
+    recorded = list(record_source_htmls([source_htmls], record_dir=str(tmp_path)))
+
+    # When
+    with ReplayServer(page_dirs=[str(tmp_path)]) as replay_server:
+        replayed = HtmlFetcher(ticker="LLY", base_urls=replay_server.base_urls).get_source_htmls()
+
+    # Then
+    assert_that(recorded, equal_to([source_htmls]))
+    assert_that(replayed.revenue_html, equal_to(source_htmls.revenue_html))
@@ -0,0 +1,68 @@
+import os
+from dataclasses import replace
+
+import pytest
+from hamcrest import assert_that, equal_to, is_not
+
+from stock_information_scraper.file_store import list_json_files
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher, SourceHtmls
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.metrics import Metrics
+from stock_information_scraper.pipeline import parallel_parse_stage, parse_stage
+from stock_information_scraper.result_cache import ResultCache, get_result_key
+from tests.fakes import FakeSession, serve_fixtures
+
+
+@pytest.fixture
+def source_htmls_list() -> list:
+    client = HttpClient(session=FakeSession(handler=serve_fixtures))
+    return ConcurrentHtmlFetcher(tickers=["LLY", "META"], client=client).get_source_htmls_list()
+
+
+def test_unchanged_pages_are_not_parsed_again(tmp_path, source_htmls_list):
+    # Given
+    result_cache = ResultCache(cache_dir=str(tmp_path))
+    first = list(parse_stage(source_htmls_list, result_cache=result_cache))
+
+    # When
+    metrics = Metrics()
+    second = list(parse_stage(source_htmls_list, result_cache=result_cache, metrics=metrics))
+    parallel = list(parallel_parse_stage(source_htmls_list, processes=2, result_cache=result_cache, metrics=metrics))
+
+    # Then
+    assert_that(second, equal_to(first))
+    assert_that(parallel, equal_to(first))
+    assert_that(metrics.stages, equal_to({}))
+
+
+def test_result_key_changes_with_pages_and_parser(source_htmls_list):
+    # Given
+    source_htmls: SourceHtmls = source_htmls_list[0]
+    key = get_result_key(source_htmls, parser="lxml", targeted=True)
+
+    # When
+    changed_page = replace(source_htmls, pe_max_html=source_htmls.pe_max_html + " ")
+
+    # Then
+    assert_that(get_result_key(replace(source_htmls), parser="lxml", targeted=True), equal_to(key))
+    assert_that(get_result_key(changed_page, parser="lxml", targeted=True), is_not(equal_to(key)))
+    assert_that(get_result_key(source_htmls, parser="html.parser", targeted=True), is_not(equal_to(key)))
+
+
+def test_result_cache_evicts_least_recently_used_entries(tmp_path, source_htmls_list):
+    # Given
+    result_cache = ResultCache(cache_dir=str(tmp_path), max_entries=10)
+    stock_information = next(parse_stage(source_htmls_list[:1]))
+    for i in range(10):
+        result_cache.put(f"{i:064x}", stock_information)
+        os.utime(result_cache._get_path(f"{i:064x}"), (i, i))
+    result_cache.get(f"{0:064x}")
+
+    # When
+    result_cache.put(f"{10:064x}", stock_information)
+
+    # Then
+    assert_that(result_cache.get(f"{0:064x}"), equal_to(stock_information))
+    assert_that(result_cache.get(f"{1:064x}"), equal_to(None))
+    assert_that(result_cache.get(f"{10:064x}"), equal_to(stock_information))
+    assert_that(len(list(list_json_files(str(tmp_path)))), equal_to(9))
@@ -0,0 +1,101 @@
+from typing import List
+
+import pytest
+import requests
+from hamcrest import assert_that, calling, close_to, equal_to, raises
+
+from stock_information_scraper.html_fetcher import ConcurrentHtmlFetcher
+from stock_information_scraper.http_client import HttpClient
+from stock_information_scraper.retry_policy import FetchError, RetryPolicy, parse_retry_after
+from tests.fakes import FakeResponse, FakeSession
+
+URL = "https://ycharts.com/companies/LLY/pe_ratio"
+
+
+@pytest.fixture
+def delays() -> List[float]:
+    return []
+
+
+@pytest.fixture
+def retry_policy(delays: List[float]) -> RetryPolicy:
+    return RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=5.0, jitter=0.0, sleep=delays.append)
+
+
+def responding(*responses: FakeResponse):
+    remaining = list(responses)
+    return lambda url: remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+
+def test_delay_grows_exponentially_up_to_max_delay(retry_policy: RetryPolicy):
+    assert_that([retry_policy.get_delay(attempt) for attempt in range(1, 6)], equal_to([1.0, 2.0, 4.0, 5.0, 5.0]))
+
+
+def test_delay_uses_retry_after(retry_policy: RetryPolicy):
+    assert_that(retry_policy.get_delay(1, retry_after="3"), equal_to(3.0))
+    assert_that(retry_policy.get_delay(1, retry_after="600"), equal_to(5.0))
+
+
+def test_parse_retry_after_reads_http_dates():
+    assert_that(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), equal_to(0.0))
+    assert_that(parse_retry_after("not a date"), equal_to(None))
+
+
+def test_jitter_shortens_delay():
+    delay = RetryPolicy(base_delay=10.0, jitter=0.5).get_delay(1)
+    assert_that(delay, close_to(7.5, 2.5))
+
+
+def test_client_retries_rate_limited_requests(retry_policy: RetryPolicy, delays: List[float]):
+    # Given
+    session = FakeSession(
+        handler=responding(
+            FakeResponse(429, headers={"Retry-After": "2"}),
+            FakeResponse(503),
+            FakeResponse(200, "<html>LLY</html>"),
+        )
+    )
+
+    # When
+    html = HttpClient(session=session, retry_policy=retry_policy).fetch_html(URL)
+
+    # Then
+    assert_that(html, equal_to("<html>LLY</html>"))
+    assert_that(delays, equal_to([2.0, 2.0]))
+
+
+def test_client_fails_fast_on_not_found(retry_policy: RetryPolicy, delays: List[float]):
+    # Given
+    client = HttpClient(session=FakeSession(handler=responding(FakeResponse(404))), retry_policy=retry_policy)
+
+    # Then
+    assert_that(calling(client.fetch_html).with_args(URL), raises(FetchError, "status 404"))
+    assert_that(delays, equal_to([]))
+
+
+def test_client_gives_up_after_max_attempts(retry_policy: RetryPolicy, delays: List[float]):
+    # Given
+    def _raise_timeout(url: str):
+        raise requests.ConnectTimeout("timed out")
+
+    client = HttpClient(session=FakeSession(handler=_raise_timeout), retry_policy=retry_policy)
+
+    # Then
+    assert_that(calling(client.fetch_html).with_args(URL), raises(FetchError, "after 4 attempt"))
+    assert_that(len(delays), equal_to(3))
+
+
+def test_concurrent_fetcher_skips_failed_tickers(retry_policy: RetryPolicy):
+    # Given
+    def _handler(url: str) -> FakeResponse:
+        return FakeResponse(404) if "/MISSING/" in url else FakeResponse(200, f"<html>{url}</html>")
+
+    client = HttpClient(session=FakeSession(handler=_handler), retry_policy=retry_policy)
+    fetcher = ConcurrentHtmlFetcher(tickers=["LLY", "MISSING", "META"], max_workers=4, client=client)
+
+    # When
+    result = fetcher.get_source_htmls_list()
+
+    # Then
+    assert_that([source_htmls.ticker for source_htmls in result], equal_to(["LLY", "META"]))
+    assert_that(fetcher.failures["MISSING"].status_code, equal_to(404))
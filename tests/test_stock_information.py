@@ -1,8 +1,23 @@
+import pickle
+from dataclasses import FrozenInstanceError
+
 import pytest
-from hamcrest import assert_that, equal_to
+from hamcrest import assert_that, calling, equal_to, is_in, is_not, raises, same_instance
 
+from stock_information_scraper import CsvHeader
+from stock_information_scraper import stock_information as stock_information_module
 from stock_information_scraper.html_fetcher import SourceHtmls
-from stock_information_scraper.stock_information import StockInformationGenerator
+from stock_information_scraper.stock_information import (
+    BatchStockInformationGenerator,
+    SeriesRule,
+    StockInformation,
+    StockInformationGenerator,
+    compile_plan,
+    nan_to_none,
+    percents_to_floats,
+    source_htmls_to_source_soups,
+    strings_to_floats,
+)
 
 
 @pytest.fixture
@@ -165,3 +180,102 @@ def test_meta(meta_source_htmls: SourceHtmls):
     assert_that(stock_information.growth_estimates.value, equal_to(19.50))
     assert_that(stock_information.pe_min.value, equal_to(8.476))
     assert_that(stock_information.pe_max.value, equal_to(37.93))
+
+
+def test_identical_pages_are_parsed_once(lly_source_htmls: SourceHtmls):
+    # When
+    source_soups = source_htmls_to_source_soups(lly_source_htmls)
+
+    # Then
+    assert_that(source_soups.eps_soup, same_instance(source_soups.revenue_soup))
+    assert_that(source_soups.roic_soup, is_not(same_instance(source_soups.book_value_soup)))
+
+
+@pytest.mark.parametrize("ticker", ["lly", "meta"])
+def test_lxml_parser_gives_same_values(ticker: str, request):
+    # Given
+    pytest.importorskip("lxml")
+    source_htmls = request.getfixturevalue(f"{ticker}_source_htmls")
+
+    # When
+    html_parser_information = StockInformationGenerator(source_htmls, parser="html.parser").get_stock_information()
+    lxml_information = StockInformationGenerator(source_htmls, parser="lxml").get_stock_information()
+
+    # Then
+    assert_that(lxml_information, equal_to(html_parser_information))
+
+
+@pytest.mark.parametrize("ticker", ["lly", "meta"])
+def test_targeted_parsing_gives_same_values(ticker: str, request):
+    # Given
+    source_htmls = request.getfixturevalue(f"{ticker}_source_htmls")
+
+    # When
+    full_information = StockInformationGenerator(source_htmls, targeted=False).get_stock_information()
+    targeted_information = StockInformationGenerator(source_htmls, targeted=True).get_stock_information()
+
+    # Then
+    assert_that(targeted_information, equal_to(full_information))
+
+
+def test_stock_information_shares_headers_and_survives_pickling(lly_source_htmls: SourceHtmls):
+    # Given
+    stock_information = StockInformationGenerator(source_htmls=lly_source_htmls).get_stock_information()
+
+    # When
+    copy = pickle.loads(pickle.dumps(stock_information))
+
+    # Then
+    assert_that(copy, equal_to(stock_information))
+    assert_that(copy.eps_max_year.csv_header, equal_to("EPS Diluted (Max Year)"))
+    assert_that(copy._csv_headers, same_instance(StockInformation.CSV_HEADERS))
+    assert_that(list(copy.to_dict()), equal_to(CsvHeader().to_list()))
+
+
+def test_stock_information_entries_cannot_be_changed(lly_source_htmls: SourceHtmls):
+    # Given
+    stock_information = StockInformationGenerator(source_htmls=lly_source_htmls).get_stock_information()
+
+    # Then
+    assert_that(calling(setattr).with_args(stock_information.eps_max_year, "value", 1.0), raises(FrozenInstanceError))
+    assert_that("_index", is_not(is_in(dir(stock_information_module))))
+    assert_that("_field", is_not(is_in(dir(stock_information_module))))
+
+
+def test_bulk_number_cleanup():
+    # When
+    values = strings_to_floats(["1,234.5", "-", "NA", "--", None, "-0.19"])
+    percents = percents_to_floats(["23.22%", "-"])
+
+    # Then
+    assert_that(nan_to_none(values), equal_to([1234.5, None, None, None, None, -0.19]))
+    assert_that(nan_to_none(percents), equal_to([23.22, None]))
+
+
+def test_batch_generator_gives_same_values_as_single_tickers(
+    lly_source_htmls: SourceHtmls, meta_source_htmls: SourceHtmls
+):
+    # Given
+    source_htmls_list = [lly_source_htmls, meta_source_htmls]
+
+    # When
+    matrix = BatchStockInformationGenerator().get_stock_information_matrix(source_htmls_list)
+
+    # Then
+    expected = [StockInformationGenerator(source_htmls).get_stock_information() for source_htmls in source_htmls_list]
+    assert_that(len(matrix), equal_to(2))
+    assert_that(list(matrix), equal_to(expected))
+    assert_that(matrix.get_column("ticker"), equal_to(["LLY", "META"]))
+    assert_that(matrix.get_column("eps_max_year"), equal_to([info.eps_max_year.value for info in expected]))
+
+
+def test_extraction_plan_reads_new_metric_without_new_method(lly_source_htmls: SourceHtmls):
+    # Given
+    plan = compile_plan([SeriesRule("gross_profit", "eps_soup", "Gross Profit", divisor=1000.0)])
+    generator = StockInformationGenerator(source_htmls=lly_source_htmls)
+
+    # When
+    gross_profit = nan_to_none(generator.extract_series(plan[0]))
+
+    # Then
+    assert_that(gross_profit[:2], equal_to([21.91, 21.01]))